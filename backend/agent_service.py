@@ -7,29 +7,25 @@ import aiohttp
 import asyncio
 import contextvars
 import logging
-import os
-import re
 from typing import Any, AsyncGenerator, Callable, Dict, List, Literal, Optional
 
-from dotenv import load_dotenv
 from langchain.agents import create_agent
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field as PydanticField
 
-from translation_context import RALPH_DETAILS
+from settings import SETTINGS
+from translation_context import get_ralph_details
 from translation_service import SYSTEM_PROMPT as TRANSLATION_SYSTEM_PROMPT, perform_fim_translation
-from translate_oz import PRETRANSLATED_LIBS, get_pretranslated_code
+from translate_oz import get_pretranslated_code, get_pretranslated_libs
 from code_doctor import fix_common_errors
 
 # Type for translation chunk callback
 TranslationChunkCallback = Callable[[str], None]
 
-load_dotenv()
-
 # Configure logging
 logger = logging.getLogger(__name__)
-log_level = os.getenv("LOG_LEVEL", "INFO")
+log_level = SETTINGS.log_level
 logger.setLevel(getattr(logging, log_level.upper()))
 # Create console handler if not already present
 if not logger.handlers:
@@ -39,10 +35,14 @@ if not logger.handlers:
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
 
-API_KEY = os.getenv("API_KEY")
-API_URL = os.getenv("API_URL")
-AGENT_MODEL = os.getenv("AGENT_MODEL", "mistralai/mistral-small-3.2-24b-instruct")
-LLM_MODEL = os.getenv("LLM_MODEL", "mistralai/devstral-2512:free")
+API_KEY = SETTINGS.api_key
+API_URL = SETTINGS.api_url
+AGENT_MODEL = SETTINGS.agent_model
+LLM_MODEL = SETTINGS.llm_model or "mistralai/devstral-2512:free"
+# Max translation chunks forwarded per wake-up of the chat loop, so agent events are not starved
+QUEUE_DRAIN_BATCH = 16
+# Chunks forwarded by the final queue drain between explicit yields to the event loop
+DRAIN_YIELD_INTERVAL = 32
 
 # --- Global Context Management ---
 
@@ -332,24 +332,38 @@ def get_session_lock() -> asyncio.Lock:
         _session_locks[session_id] = asyncio.Lock()
     return _session_locks[session_id]
 
+def _field_from_dict(f: dict) -> Optional[Field]:
+    try:
+        return Field(**f)
+    except Exception:
+        return None
+
+
+def _field_from_str(f: str) -> Optional[Field]:
+    # Attempt to parse "name: type" string
+    name, sep, type_ = f.partition(":")
+    if not sep:
+        return None
+    return Field(name=name.strip(), type=type_.strip())
+
+
+# Parsers by exact element type, anything else is dropped
+_FIELD_PARSERS: Dict[type, Callable[[Any], Optional[Field]]] = {
+    dict: _field_from_dict,
+    str: _field_from_str,
+}
+
+
 def _safe_parse_fields(fields: Any) -> List[Field]:
     """Helper to safely parse fields that might be malformed by the LLM."""
     if not isinstance(fields, list):
         return []
-    
-    parsed = []
-    for f in fields:
-        if isinstance(f, dict):
-            try:
-                parsed.append(Field(**f))
-            except Exception:
-                continue
-        elif isinstance(f, str):
-            # Attempt to parse "name: type" string
-            if ":" in f:
-                parts = f.split(":", 1)
-                parsed.append(Field(name=parts[0].strip(), type=parts[1].strip()))
-    return parsed
+
+    return [
+        field
+        for f in fields
+        if (parser := _FIELD_PARSERS.get(type(f))) is not None and (field := parser(f)) is not None
+    ]
 
 
 def _extract_ralph_code(text: str) -> str:
@@ -357,16 +371,23 @@ def _extract_ralph_code(text: str) -> str:
     Extract Ralph code or generic code block from text containing markdown code fences.
     Ensures that trailing/leading whitespace and markdown fences are removed.
     """
-    cleaned_content = text.strip()
-    if "```" in cleaned_content:
-        match = re.search(r"```(?:ralph)?\s*(.*?)\s*```", cleaned_content, re.DOTALL)
-        if match:
-            return match.group(1).strip()
-        else:
-            return "\n".join(
-                [l for l in cleaned_content.split("\n") if not l.strip().startswith("```")]
-            ).strip()
-    return cleaned_content
+    start = text.find("```")
+    if start < 0:
+        return text.strip()
+
+    body_start = start + 3
+    end = text.find("```", body_start)
+    if end < 0:
+        # Unclosed fence, drop the fence lines and keep the rest
+        return "\n".join([l for l in text.split("\n") if not l.strip().startswith("```")]).strip()
+
+    # Skip the language tag (```ralph, ```rust, ...) when it sits alone on the fence line
+    newline = text.find("\n", body_start, end)
+    if newline >= 0 and text[body_start:newline].strip().isidentifier():
+        body_start = newline + 1
+    elif text.startswith("ralph", body_start):
+        body_start += 5
+    return text[body_start:end].strip()
 
 
 # --- Helper for human readable logs ---
@@ -923,7 +944,7 @@ class ChatAgent:
         )
 
         # Pre-process available libraries for the prompt
-        available_libs = list(PRETRANSLATED_LIBS.keys())
+        available_libs = list(get_pretranslated_libs().keys())
         formatted_libs = "\n".join([f"- {lib}" for lib in available_libs])
 
         # Prompt
@@ -1032,6 +1053,13 @@ class ChatAgent:
                                 try:
                                     item = queue_task.result()
                                     yield item
+                                    # Forward chunks that are already queued without a task per chunk
+                                    for _ in range(QUEUE_DRAIN_BATCH - 1):
+                                        try:
+                                            item = translation_chunk_queue.get_nowait()
+                                        except asyncio.QueueEmpty:
+                                            break
+                                        yield item
                                 except Exception as e:
                                     logger.error(f"Error reading from translation queue: {e}")
                                 queue_task = asyncio.create_task(translation_chunk_queue.get())
@@ -1075,8 +1103,13 @@ class ChatAgent:
                                 except StopAsyncIteration:
                                     # Finished agent stream. Drain remaining queue items.
                                     queue_task.cancel()
+                                    drained = 0
                                     while not translation_chunk_queue.empty():
                                         yield translation_chunk_queue.get_nowait()
+                                        drained += 1
+                                        # The drain never suspends on its own, let other tasks run now and then
+                                        if drained % DRAIN_YIELD_INTERVAL == 0:
+                                            await asyncio.sleep(0)
                                     break
                     finally:
                         if not agent_task.done():
@@ -1132,7 +1165,7 @@ class ChatAgent:
 Your task is to fix Ralph code that has compilation errors.
 
 ## Ralph Language Reference
-{RALPH_DETAILS}
+{get_ralph_details()}
 {solidity_context}
 ## CRITICAL RULES - VIOLATION WILL CAUSE FAILURE:
 1. Analyze the error message and fix ONLY the specific syntax/compilation error mentioned
@@ -1211,8 +1244,7 @@ COMPLETE RALPH CODE (you must return ALL of it with only the error fixed):
 
 
     async def _compile_ralph_code(self, code: str) -> Dict[str, Any]:
-        node_url = os.getenv("NODE_URL", "https://node.testnet.alephium.org")
-        compile_endpoint = f"{node_url}/contracts/compile-project"
+        compile_endpoint = f"{SETTINGS.node_url}/contracts/compile-project"
         
         compile_request = {
             "code": code,
@@ -21,6 +21,7 @@ class TranslateRequest(BaseModel):
     source_code: str
     options: TranslationOptions
     previous_translation: Optional[PreviousTranslation] = None
+    no_cache: bool = False  # Whether to skip cached translations, e.g. to retry an unsatisfying result
 
 
 class TranslateResponse(BaseModel):
@@ -30,6 +31,14 @@ class TranslateResponse(BaseModel):
     errors: list[str] = []
 
 
+class TranslateBatchRequest(BaseModel):
+    requests: list[TranslateRequest]
+
+
+class TranslateBatchResponse(BaseModel):
+    results: list[TranslateResponse]
+
+
 # Chat API Types
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
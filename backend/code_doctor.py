@@ -1,5 +1,54 @@
 import re
-from typing import Set, Optional
+from functools import lru_cache
+from typing import FrozenSet, Set, Optional
+
+# Builtin detection scans run over whole function bodies, use the linear-time RE2 engine when installed
+try:
+    import re2 as _detect_re
+except ImportError:
+    _detect_re = re
+
+# Patterns are compiled once at import, the doctor runs on every generated snippet
+# Contract header, group 1 is the name and group 2 the fields block
+_CONTRACT_RE = re.compile(r'(?:Abstract\s+)?Contract\s+(\w+)\s*\((.*?)\)\s*(?:extends[^{]*)?\s*(?:implements[^{]*)?\s*\{', re.DOTALL)
+_MUT_FIELD_RE = re.compile(r'mut\s+(\w+)')
+# mapping[KeyType, ValueType] mapName
+_MAPPING_DECL_RE = re.compile(r'mapping\s*\[[^\]]+\]\s+(\w+)')
+# Multiline mode with line-start anchor to avoid matching inside comments
+_FUNCTION_RE = re.compile(r'^[ \t]*((?:@using\([^)]+\)\s*)?)(pub\s+)?fn\s+(\w+)\s*\(([^)]*)\)\s*(?:->\s*[^{]+)?\s*\{', re.MULTILINE)
+_TOKEN_REMAINING_SELF_RE = _detect_re.compile(r'tokenRemaining!\s*\(\s*selfAddress!\s*\(\s*\)')
+_BURN_TOKEN_SELF_RE = _detect_re.compile(r'burnToken!\s*\(\s*selfAddress!\s*\(\s*\)')
+_CREATE_CONTRACT_WITH_ASSETS_RE = _detect_re.compile(r'(?:createContract|createSubContract|copyCreateContract|copyCreateSubContract)!\s*\{')
+_BUILTIN_CALL_RE = _detect_re.compile(r'(\w+)!')
+_ASSIGNMENT_SPLIT_RE = re.compile(r'([!=<>]=|=)')
+_ANY_MAP_INSERT_RE = re.compile(r'\w+\.insert!\s*\(')
+_ANY_MAP_REMOVE_RE = re.compile(r'\w+\.remove!\s*\(')
+
+# Scanner states of CodeDoctor.scan_and_fix
+_CODE, _LINE_COMMENT, _DQ_STRING, _BACKTICK = range(4)
+
+# Annotation requirements found by CodeDoctor.analyze_function
+FLAG_ASSETS_IN_CONTRACT = 1 << 0
+FLAG_PREAPPROVED_ASSETS = 1 << 1
+FLAG_UPDATE_FIELDS = 1 << 2
+FLAG_CHECK_CALLER = 1 << 3
+FLAG_HAS_INSERT = 1 << 4
+FLAG_TRANSFER_TOKEN_TO_SELF = 1 << 5
+
+# Builtins whose call alone sets flags
+_BUILTIN_FLAGS = {
+    'transferTokenFromSelf': FLAG_ASSETS_IN_CONTRACT,
+    'transferTokenToSelf': FLAG_PREAPPROVED_ASSETS | FLAG_TRANSFER_TOKEN_TO_SELF,
+    # lockApprovedAssets! requires preapprovedAssets = true
+    'lockApprovedAssets': FLAG_PREAPPROVED_ASSETS,
+    'insert': FLAG_PREAPPROVED_ASSETS | FLAG_HAS_INSERT,
+    'checkCaller': FLAG_CHECK_CALLER,
+}
+_CREATE_CONTRACT_BUILTINS = frozenset({'createContract', 'createSubContract', 'copyCreateContract', 'copyCreateSubContract'})
+
+# Number of distinct (code, mappings) inputs whose fixed output is kept in memory
+FIX_CACHE_SIZE = 256
+
 
 class CodeDoctor:
     def __init__(self, source_code: str, external_mappings: Optional[Set[str]] = None):
@@ -9,9 +58,7 @@ class CodeDoctor:
 
     def fix_all(self) -> str:
         self.extract_mutable_fields()
-        self.source_code = self.fix_enums(self.source_code)
-        self.source_code = self.fix_underscores(self.source_code)
-        self.source_code = self.fix_map_insert(self.source_code)
+        self.source_code = self.scan_and_fix(self.source_code)
         self.source_code = self.fix_annotations(self.source_code)
         return self.source_code
 
@@ -22,14 +69,11 @@ class CodeDoctor:
         # Also store mapping names per contract
         self.contract_mappings = {}
         
-        # Regex to find Contract definitions
-        contract_pattern = re.compile(r'(?:Abstract\s+)?Contract\s+(\w+)\s*\((.*?)\)\s*(?:extends[^{]*)?\s*(?:implements[^{]*)?\s*\{', re.DOTALL)
-        
-        for match in contract_pattern.finditer(self.source_code):
+        for match in _CONTRACT_RE.finditer(self.source_code):
             contract_name = match.group(1)
             fields_block = match.group(2)
             # Find all 'mut fieldName'
-            mut_fields = re.findall(r'mut\s+(\w+)', fields_block)
+            mut_fields = _MUT_FIELD_RE.findall(fields_block)
             self.contract_mutable_fields[contract_name] = set(mut_fields)
             
             # Find the contract body to extract mappings
@@ -38,7 +82,7 @@ class CodeDoctor:
             if contract_end != -1:
                 contract_body = self.source_code[contract_start:contract_end-1]
                 # Find all mapping declarations: mapping[KeyType, ValueType] mapName
-                mapping_names = re.findall(r'mapping\s*\[[^\]]+\]\s+(\w+)', contract_body)
+                mapping_names = _MAPPING_DECL_RE.findall(contract_body)
                 self.contract_mappings[contract_name] = set(mapping_names)
             else:
                 self.contract_mappings[contract_name] = set()
@@ -48,111 +92,117 @@ class CodeDoctor:
         for fields in self.contract_mutable_fields.values():
             self.mutable_fields.update(fields)
 
-    def fix_enums(self, code: str) -> str:
-        lines = code.split('\n')
-        new_lines = []
-        in_enum = False
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('enum ') and stripped.endswith('{'):
-                in_enum = True
-                new_lines.append(line)
-                continue
-            
-            if in_enum:
-                if stripped == '}':
-                    in_enum = False
-                    new_lines.append(line)
-                    continue
-                # Remove trailing comma if present
-                if line.rstrip().endswith(','):
-                    # Find the last comma and remove it
-                    idx = line.rfind(',')
-                    line = line[:idx] + line[idx+1:]
-            
-            new_lines.append(line)
-        return '\n'.join(new_lines)
-
-    def fix_underscores(self, code: str) -> str:
-        # Iterate and rebuild string, skipping strings and comments
+    def scan_and_fix(self, code: str) -> str:
+        """
+        Fixes enum trailing commas, `_name` identifiers and `map.insert!{...}(` calls in a single pass.
+        Identifiers and insert! calls inside strings and comments are left untouched.
+        """
         result = []
+        append = result.append
+        state = _CODE
         i = 0
         n = len(code)
-        
+        next_line = 0  # start index of the next line to inspect for enum context
+        in_enum = False
+        drop_comma_at = -1
+
         while i < n:
-            # Check for string start (double quotes)
-            if code[i] == '"':
-                # Find end of string
-                result.append('"')
+            # Enum context is decided per line, whatever the scanner state is
+            while i >= next_line:
+                line_end = code.find('\n', next_line)
+                if line_end == -1:
+                    line_end = n
+                line = code[next_line:line_end]
+                stripped = line.strip()
+                if stripped.startswith('enum ') and stripped.endswith('{'):
+                    in_enum = True
+                elif in_enum:
+                    if stripped == '}':
+                        in_enum = False
+                    elif stripped.endswith(','):
+                        # Remove trailing comma of enum values
+                        drop_comma_at = next_line + line.rfind(',')
+                next_line = line_end + 1
+
+            char = code[i]
+
+            if i == drop_comma_at:
                 i += 1
-                while i < n:
-                    result.append(code[i])
-                    if code[i] == '"' and code[i-1] != '\\':
-                        i += 1
-                        break
-                    i += 1
                 continue
-            
-            # Check for backtick string (b`...`)
-            if code[i:i+2] == 'b`':
-                result.append('b`')
+
+            if state == _DQ_STRING:
+                append(char)
+                if char == '"' and code[i-1] != '\\':
+                    state = _CODE
+                i += 1
+                continue
+
+            if state == _BACKTICK:
+                append(char)
+                if char == '`':
+                    state = _CODE
+                i += 1
+                continue
+
+            if state == _LINE_COMMENT:
+                if char == '\n':
+                    state = _CODE
+                append(char)
+                i += 1
+                continue
+
+            # Code state
+            if char == '"':
+                state = _DQ_STRING
+                append(char)
+                i += 1
+                continue
+
+            # Backtick string (b`...`)
+            if char == 'b' and code.startswith('`', i + 1):
+                state = _BACKTICK
+                append('b`')
                 i += 2
-                while i < n:
-                    result.append(code[i])
-                    if code[i] == '`':
-                        i += 1
-                        break
-                    i += 1
                 continue
-                
-            # Check for comment //
-            if code[i:i+2] == '//':
-                # Read until newline
-                while i < n and code[i] != '\n':
-                    result.append(code[i])
-                    i += 1
+
+            if char == '/' and code.startswith('/', i + 1):
+                state = _LINE_COMMENT
+                append('//')
+                i += 2
                 continue
-                
-            # Check for identifier starting with _
-            # We need to check if we are at a word boundary
-            if code[i] == '_':
-                # Check previous char
+
+            # <map>.insert!{...}(...) -> <map>.insert!(...)
+            if char == '.' and code.startswith('.insert!{', i):
+                close = code.find('}', i + 9)
+                if close != -1 and code.startswith('(', close + 1):
+                    append('.insert!(')
+                    i = close + 2
+                    continue
+
+            # _Identifier -> Identifier_, only at a word boundary
+            if char == '_' and i + 1 < n and code[i+1].isalnum():
                 prev_char = code[i-1] if i > 0 else ' '
                 if not prev_char.isalnum() and prev_char != '_':
-                    # It is a start of an identifier?
-                    # Check next char
-                    if i+1 < n and code[i+1].isalnum():
-                        # Found _Identifier
-                        # Capture identifier
-                        j = i + 1
-                        ident = ""
-                        while j < n and (code[j].isalnum() or code[j] == '_'):
-                            ident += code[j]
-                            j += 1
-                        
-                        # Append Identifier_
-                        result.append(ident + "_")
-                        i = j
-                        continue
-            
-            result.append(code[i])
+                    j = i + 1
+                    while j < n and (code[j].isalnum() or code[j] == '_'):
+                        j += 1
+                    append(code[i+1:j])
+                    append('_')
+                    i = j
+                    continue
+
+            append(char)
             i += 1
-            
-        return "".join(result)
 
-    def fix_map_insert(self, code: str) -> str:
-        # <map>.insert!{...}(...) -> <map>.insert!(...)
-        return re.sub(r'\.insert!\{[^}]*\}\(', '.insert!(', code)
+        return "".join(result)
 
     def find_containing_contract(self, code: str, position: int) -> str | None:
         """Find which contract contains the given position."""
-        # Find all contract starts before this position
-        contract_pattern = re.compile(r'(?:Abstract\s+)?Contract\s+(\w+)\s*\(.*?\)\s*(?:extends[^{]*)?\s*(?:implements[^{]*)?\s*\{', re.DOTALL)
-        
         best_contract = None
         best_start = -1
         
-        for match in contract_pattern.finditer(code):
+        # Find all contract starts before this position
+        for match in _CONTRACT_RE.finditer(code):
             if match.end() <= position:
                 # This contract starts before our position
                 # Check if it also ends after our position
@@ -174,20 +224,18 @@ class CodeDoctor:
         # Since we need to modify the @using part which is BEFORE the function, 
         # and the decision depends on the body, we need to parse the function first.
         
-        # Let's find all function starts.
-        # Use multiline mode with line-start anchor to avoid matching inside comments
-        func_pattern = re.compile(r'^[ \t]*((?:@using\([^)]+\)\s*)?)(pub\s+)?fn\s+(\w+)\s*\(([^)]*)\)\s*(?:->\s*[^{]+)?\s*\{', re.MULTILINE)
+        # Let's find all function starts with _FUNCTION_RE.
         
         # We'll iterate through matches, find the matching closing brace for the body,
         # analyze the body, and reconstruct the function header.
         
         # To do this safely, we can't just replace in place easily because lengths change.
-        # We will build a new code string.
+        # We will collect the pieces of the new code and join them once at the end.
         
-        new_code = ""
+        parts = []
         last_pos = 0
         
-        for match in func_pattern.finditer(code):
+        for match in _FUNCTION_RE.finditer(code):
             start_pos = match.start()
             
             # Check if this line is commented out (starts with //)
@@ -233,15 +281,13 @@ class CodeDoctor:
             
             # Determine indentation by looking at the line start of the function
             line_start = code.rfind('\n', 0, start_pos) + 1
-            indent = ""
-            for c in code[line_start:]:
-                if c in ' \t':
-                    indent += c
-                else:
-                    break
+            indent_end = line_start
+            while indent_end < len(code) and code[indent_end] in ' \t':
+                indent_end += 1
+            indent = code[line_start:indent_end]
             
             # Append everything before this function
-            new_code += code[last_pos:line_start]
+            parts.append(code[last_pos:line_start])
             
             # Reconstruct header
             # Remove existing annotation from header if it was captured
@@ -250,17 +296,16 @@ class CodeDoctor:
                 header_without_annotation = full_header_stripped[len(existing_annotation):].lstrip()
             
             if new_annotation:
-                new_code += f"{indent}{new_annotation}\n{indent}{header_without_annotation}"
-            else:
-                new_code += f"{indent}{header_without_annotation}"
+                parts.extend((indent, new_annotation, "\n"))
+            parts.extend((indent, header_without_annotation))
                 
             # Append body
-            new_code += body_content + "}"
+            parts.extend((body_content, "}"))
             
             last_pos = body_end
             
-        new_code += code[last_pos:]
-        return new_code
+        parts.append(code[last_pos:])
+        return "".join(parts)
 
     def find_matching_brace(self, code: str, start_index: int) -> int:
         # start_index is the index of '{'
@@ -277,7 +322,7 @@ class CodeDoctor:
                     if code[i] == '"' and code[i-1] != '\\':
                         break
                     i += 1
-            elif char == '/' and i+1 < n and code[i+1] == '/':
+            elif char == '/' and code.startswith('/', i + 1):
                 i += 2
                 while i < n and code[i] != '\n':
                     i += 1
@@ -306,7 +351,7 @@ class CodeDoctor:
                     i += 1
                 result.append(" ") # Replace string with space
             # Backtick strings (b`...`)
-            elif code[i:i+2] == 'b`':
+            elif code.startswith('b`', i):
                 i += 2
                 while i < n:
                     if code[i] == '`':
@@ -315,7 +360,7 @@ class CodeDoctor:
                     i += 1
                 result.append(" ") # Replace string with space
             # Comments
-            elif code[i:i+2] == '//':
+            elif code.startswith('//', i):
                 while i < n and code[i] != '\n':
                     i += 1
                 result.append(" ") # Replace comment with space
@@ -324,36 +369,27 @@ class CodeDoctor:
                 i += 1
         return "".join(result)
 
-    def has_assignment_at_main_scope(self, body: str, pattern: str) -> bool:
+    def has_assignment_at_main_scope(self, body: str, pattern: str | re.Pattern) -> bool:
         """Check if pattern matches at main scope (brace depth 0) of function body."""
-        # Scan through body tracking brace depth
-        # When at depth 0, check if current position matches the pattern
-        
+        # Search for candidate matches and compute the brace depth at each of them,
+        # counting braces only over the span since the previous candidate
+        regex = re.compile(pattern)
         depth = 0
-        i = 0
-        n = len(body)
+        counted_to = 0
         
-        while i < n:
-            char = body[i]
-            
-            if char == '{':
-                depth += 1
-                i += 1
-            elif char == '}':
-                depth -= 1
-                i += 1
-            elif depth == 0:
-                # At main scope - check if pattern matches here
-                match = re.match(pattern, body[i:])
-                if match:
-                    return True
-                i += 1
-            else:
-                i += 1
+        match = regex.search(body)
+        while match:
+            start = match.start()
+            depth += body.count('{', counted_to, start) - body.count('}', counted_to, start)
+            counted_to = start
+            if depth == 0:
+                return True
+            match = regex.search(body, start + 1)
         
         return False
 
-    def analyze_function(self, body: str, params: str, mutable_fields: set = None, mappings: set = None) -> dict:
+    def analyze_function(self, body: str, params: str, mutable_fields: set = None, mappings: set = None) -> int:
+        """Returns the FLAG_* bits required by the function body."""
         if mutable_fields is None:
             mutable_fields = self.mutable_fields
         if mappings is None:
@@ -361,123 +397,95 @@ class CodeDoctor:
         # Include external mappings (passed from outside when contract context is known)
         mappings = mappings | self.external_mappings
             
-        flags = {
-            'assetsInContract': False,
-            'preapprovedAssets': False,
-            'updateFields': False,
-            'checkCaller': False,
-            'hasInsert': False,
-            'hasTransferTokenToSelf': False
-        }
+        flags = 0
         
         clean_body = self.strip_comments_and_strings(body)
         
+        # Collect every builtin called in the body in a single scan
+        called = {match.group(1) for match in _BUILTIN_CALL_RE.finditer(clean_body)}
+        
+        # Rules 2, 3, 7 and checkCaller! only depend on the builtin being called
+        for name in called:
+            flags |= _BUILTIN_FLAGS.get(name, 0)
+        
         # Rule 1: tokenRemaining with selfAddress!()
-        if re.search(r'tokenRemaining!\s*\(\s*selfAddress!\s*\(\s*\)', clean_body):
-            flags['assetsInContract'] = True
-            
-        # Rule 2: transferTokenFromSelf!
-        if 'transferTokenFromSelf!' in clean_body:
-            flags['assetsInContract'] = True
-            
-        # Rule 3: transferTokenToSelf!
-        if 'transferTokenToSelf!' in clean_body:
-            flags['preapprovedAssets'] = True
-            flags['hasTransferTokenToSelf'] = True
+        if 'tokenRemaining' in called and _TOKEN_REMAINING_SELF_RE.search(clean_body):
+            flags |= FLAG_ASSETS_IN_CONTRACT
             
         # transferToken! requires preapprovedAssets = true
-        if 'transferToken!' in clean_body and 'transferTokenFromSelf!' not in clean_body and 'transferTokenToSelf!' not in clean_body:
-            flags['preapprovedAssets'] = True
+        if 'transferToken' in called and 'transferTokenFromSelf' not in called and 'transferTokenToSelf' not in called:
+            flags |= FLAG_PREAPPROVED_ASSETS
             
         # burnToken! requires preapprovedAssets = true (when burning from external caller)
         # or assetsInContract = true (when burning contract's own assets)
         # We'll assume preapprovedAssets for safety as it's more common
-        if 'burnToken!' in clean_body:
+        if 'burnToken' in called:
             # Check if burning from selfAddress
-            if re.search(r'burnToken!\s*\(\s*selfAddress!\s*\(\s*\)', clean_body):
-                flags['assetsInContract'] = True
+            if _BURN_TOKEN_SELF_RE.search(clean_body):
+                flags |= FLAG_ASSETS_IN_CONTRACT
             else:
-                flags['preapprovedAssets'] = True
-                
-        # lockApprovedAssets! requires preapprovedAssets = true
-        if 'lockApprovedAssets!' in clean_body:
-            flags['preapprovedAssets'] = True
-            
-        # createContract! with asset transfer requires preapprovedAssets = true
-        if re.search(r'createContract!\s*\{', clean_body):
-            flags['preapprovedAssets'] = True
+                flags |= FLAG_PREAPPROVED_ASSETS
             
-        # createSubContract! with asset transfer requires preapprovedAssets = true
-        if re.search(r'createSubContract!\s*\{', clean_body):
-            flags['preapprovedAssets'] = True
-            
-        # copyCreateContract! with asset transfer requires preapprovedAssets = true
-        if re.search(r'copyCreateContract!\s*\{', clean_body):
-            flags['preapprovedAssets'] = True
-            
-        # copyCreateSubContract! with asset transfer requires preapprovedAssets = true
-        if re.search(r'copyCreateSubContract!\s*\{', clean_body):
-            flags['preapprovedAssets'] = True
-            
-        # Rule 7: insert! requires preapprovedAssets
-        if 'insert!' in clean_body:
-            flags['preapprovedAssets'] = True
-            flags['hasInsert'] = True
+        # createContract!, createSubContract!, copyCreateContract! and copyCreateSubContract!
+        # with asset transfer require preapprovedAssets = true
+        if not called.isdisjoint(_CREATE_CONTRACT_BUILTINS) and _CREATE_CONTRACT_WITH_ASSETS_RE.search(clean_body):
+            flags |= FLAG_PREAPPROVED_ASSETS
             
         # Rule 4: Assigns to mutable field - ALWAYS requires updateFields (any scope)
+        # Split by lines and check if field appears on left side of assignment
+        lines = clean_body.split('\n') if mutable_fields and '=' in clean_body else []
         for field in mutable_fields:
             # Check for assignment: field = ... or field[...] = ... or field.property = ...
-            # Split by lines and check if field appears on left side of assignment
-            for line in clean_body.split('\n'):
+            field_re = None
+            for line in lines:
                 # Skip if line doesn't contain the field name
                 if field not in line:
                     continue
                 # Check if there's an assignment (= but not ==, !=, <=, >=)
                 if '=' not in line:
                     continue
+                if field_re is None:
+                    field_re = re.compile(rf'\b{field}\b')
                 # Find all = signs that are not part of ==, !=, <=, >=
-                parts = re.split(r'([!=<>]=|=)', line)
+                parts = _ASSIGNMENT_SPLIT_RE.split(line)
                 for i, part in enumerate(parts):
                     if part == '=' and i > 0:
                         # Check if field appears before this =
                         left_side = ''.join(parts[:i])
-                        if re.search(rf'\b{field}\b', left_side):
-                            flags['updateFields'] = True
+                        if field_re.search(left_side):
+                            flags |= FLAG_UPDATE_FIELDS
                             break
         
         # Mapping modifications only require updateFields at MAIN SCOPE
         for mapping_name in mappings:
             # Check for assignment: mapping[...] = ...
             if self.has_assignment_at_main_scope(clean_body, rf'\b{mapping_name}\s*\[.*?\]\s*=[^=]'):
-                flags['updateFields'] = True
+                flags |= FLAG_UPDATE_FIELDS
             # Check for mapping.insert!(...) - modifies mapping state
             if self.has_assignment_at_main_scope(clean_body, rf'\b{mapping_name}\.insert!\s*\('):
-                flags['updateFields'] = True
+                flags |= FLAG_UPDATE_FIELDS
             # Check for mapping.remove!(...) - modifies mapping state
             if self.has_assignment_at_main_scope(clean_body, rf'\b{mapping_name}\.remove!\s*\('):
-                flags['updateFields'] = True
+                flags |= FLAG_UPDATE_FIELDS
         
         # If no contract context, check for any .insert!() or .remove!() calls on unknown mappings at main scope
         if not mappings:
-            if self.has_assignment_at_main_scope(clean_body, r'\w+\.insert!\s*\('):
-                flags['updateFields'] = True
-            if self.has_assignment_at_main_scope(clean_body, r'\w+\.remove!\s*\('):
-                flags['updateFields'] = True
-                
-        # Check for checkCaller!
-        if 'checkCaller!' in clean_body:
-            flags['checkCaller'] = True
+            if self.has_assignment_at_main_scope(clean_body, _ANY_MAP_INSERT_RE):
+                flags |= FLAG_UPDATE_FIELDS
+            if self.has_assignment_at_main_scope(clean_body, _ANY_MAP_REMOVE_RE):
+                flags |= FLAG_UPDATE_FIELDS
             
         return flags
 
-    def construct_annotation(self, analysis: dict, existing_annotation_str: str, is_public: bool) -> str:
+    def construct_annotation(self, analysis: int, existing_annotation_str: str, is_public: bool) -> str:
         # Parse existing annotation if any
         current_props = {}
         if existing_annotation_str:
             # Extract content inside @using(...)
-            match = re.search(r'@using\((.*)\)', existing_annotation_str)
-            if match:
-                content = match.group(1)
+            start = existing_annotation_str.find('@using(')
+            end = existing_annotation_str.rfind(')')
+            if start != -1 and end > start:
+                content = existing_annotation_str[start + 7:end]
                 parts = content.split(',')
                 for part in parts:
                     if '=' in part:
@@ -485,13 +493,13 @@ class CodeDoctor:
                         current_props[key.strip()] = val.strip()
 
         # Apply rules to update props
-        if analysis['assetsInContract']:
+        if analysis & FLAG_ASSETS_IN_CONTRACT:
             current_props['assetsInContract'] = 'true'
             
-        if analysis['preapprovedAssets']:
+        if analysis & FLAG_PREAPPROVED_ASSETS:
             current_props['preapprovedAssets'] = 'true'
             
-        if analysis['updateFields']:
+        if analysis & FLAG_UPDATE_FIELDS:
             current_props['updateFields'] = 'true'
         elif 'updateFields' in current_props:
             del current_props['updateFields']
@@ -499,7 +507,7 @@ class CodeDoctor:
         # Rule 9: If preapprovedAssets = true but not assetsInContract = true AND there is transferTokenToSelf!, payToContractOnly = true must be added.
         if (current_props.get('preapprovedAssets') == 'true' and 
             current_props.get('assetsInContract') != 'true' and
-            analysis.get('hasTransferTokenToSelf', False)):
+            analysis & FLAG_TRANSFER_TOKEN_TO_SELF):
             current_props['payToContractOnly'] = 'true'
         elif 'payToContractOnly' in current_props:
             del current_props['payToContractOnly']
@@ -514,7 +522,7 @@ class CodeDoctor:
             current_props.get('preapprovedAssets') == 'true'
         )
         
-        if needs_check_external and not analysis['checkCaller']:
+        if needs_check_external and not (analysis & FLAG_CHECK_CALLER):
             if is_public:
                 current_props['checkExternalCaller'] = 'false'
             else:
@@ -533,6 +541,11 @@ class CodeDoctor:
         return f"@using({', '.join(props_list)})"
 
 def fix_common_errors(ralph_code: str, mappings: Optional[Set[str]] = None) -> str:
+    return _fix_common_errors_cached(ralph_code, frozenset(mappings or ()))
+
+@lru_cache(maxsize=FIX_CACHE_SIZE)
+def _fix_common_errors_cached(ralph_code: str, mappings: FrozenSet[str]) -> str:
+    # Fixing is deterministic, regenerated snippets are often identical to ones already fixed
     doctor = CodeDoctor(ralph_code, external_mappings=mappings)
     return doctor.fix_all()
 
@@ -7,10 +7,12 @@ Gas constants sourced from Alephium repository:
 - protocol/src/main/scala/org/alephium/protocol/model/Transaction.scala
 """
 
+import copy
 import re
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 # =============================================================================
@@ -600,14 +602,18 @@ class RalphGasEstimator:
     
     def estimate_all_functions(self, ralph_code: str) -> Dict[str, GasBreakdown]:
         """Estimate gas for all functions in a contract."""
-        results = {}
+        return dict(self.iter_all_functions(ralph_code))
+    
+    def iter_all_functions(self, ralph_code: str) -> Iterator[Tuple[str, GasBreakdown]]:
+        """Estimate gas for all functions in a contract, yielding each one as soon as it is analyzed."""
+        # Every function definition contains `fn`, skip the regex scan when it can't match
+        if "fn" not in ralph_code:
+            return
         
         # Find all function names
         for match in self.PATTERNS["function_def"].finditer(ralph_code):
             func_name = match.group(2)
-            results[func_name] = self.estimate_function(ralph_code, func_name)
-        
-        return results
+            yield func_name, self.estimate_function(ralph_code, func_name)
     
     def format_report(self, breakdown: GasBreakdown, function_name: Optional[str] = None) -> str:
         """Format a human-readable gas estimation report."""
@@ -677,6 +683,9 @@ def find_function_locations(ralph_code: str) -> List[FunctionLocation]:
         List of FunctionLocation with name and line numbers
     """
     locations = []
+    if "fn" not in ralph_code:
+        return locations
+    
     lines = ralph_code.split('\n')
     
     # Pattern to match function definitions
@@ -739,6 +748,10 @@ def find_function_locations(ralph_code: str) -> List[FunctionLocation]:
 # Singleton instance
 _estimator: Optional[RalphGasEstimator] = None
 
+# Number of distinct sources whose estimation results are kept in memory.
+# The same code is often estimated repeatedly (frontend re-renders, hover in the editor).
+ESTIMATE_CACHE_SIZE = 256
+
 
 def get_gas_estimator() -> RalphGasEstimator:
     """Get or create the global gas estimator instance."""
@@ -759,6 +772,12 @@ def estimate_gas(ralph_code: str, function_name: Optional[str] = None) -> Dict:
     Returns:
         Dictionary with gas estimation details
     """
+    # Copy so callers can't modify the cached result
+    return copy.deepcopy(_estimate_gas_cached(ralph_code, function_name))
+
+
+@lru_cache(maxsize=ESTIMATE_CACHE_SIZE)
+def _estimate_gas_cached(ralph_code: str, function_name: Optional[str] = None) -> Dict:
     estimator = get_gas_estimator()
     breakdown = estimator.estimate(ralph_code, function_name)
     result = breakdown.to_dict()
@@ -776,15 +795,34 @@ def estimate_all_functions(ralph_code: str) -> Dict[str, Dict]:
     Returns:
         Dictionary mapping function names to their estimation details
     """
+    # Copy so callers can't modify the cached result
+    return copy.deepcopy(_estimate_all_functions_cached(ralph_code))
+
+
+@lru_cache(maxsize=ESTIMATE_CACHE_SIZE)
+def _estimate_all_functions_cached(ralph_code: str) -> Dict[str, Dict]:
+    return dict(iter_all_functions(ralph_code))
+
+
+def iter_all_functions(ralph_code: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    Estimate gas for all functions in Ralph code, one function at a time.
+    
+    Unlike estimate_all_functions(), results are not cached and are yielded
+    as soon as each function is analyzed, so they can be streamed.
+    
+    Args:
+        ralph_code: The Ralph source code
+    
+    Yields:
+        Tuples of function name and its estimation details
+    """
     estimator = get_gas_estimator()
-    results = {}
     
-    for func_name, breakdown in estimator.estimate_all_functions(ralph_code).items():
+    for func_name, breakdown in estimator.iter_all_functions(ralph_code):
         result = breakdown.to_dict()
         result["report"] = estimator.format_report(breakdown, func_name)
-        results[func_name] = result
-    
-    return results
+        yield func_name, result
 
 
 def estimate_with_annotations(ralph_code: str) -> Dict:
@@ -800,6 +838,12 @@ def estimate_with_annotations(ralph_code: str) -> Dict:
     Returns:
         Dictionary with function estimates and line mappings
     """
+    # Copy so callers can't modify the cached result
+    return copy.deepcopy(_estimate_with_annotations_cached(ralph_code))
+
+
+@lru_cache(maxsize=ESTIMATE_CACHE_SIZE)
+def _estimate_with_annotations_cached(ralph_code: str) -> Dict:
     estimator = get_gas_estimator()
     
     # Get function locations
@@ -1,11 +1,16 @@
 # backend/main.py
+import asyncio
+import itertools
 import json
+import logging
 import os
+from contextlib import asynccontextmanager
 from typing import List
 
-from dotenv import load_dotenv
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
@@ -16,16 +21,50 @@ from api_types import (
     GasEstimateAllFunctionsResponse,
     GasEstimateRequest,
     GasEstimateResponse,
+    GasOperationBreakdown,
+    TranslateBatchRequest,
+    TranslateBatchResponse,
     TranslateRequest,
     TranslateResponse,
 )
 from agent_service import get_agent
-from gas_estimator import estimate_all_functions, estimate_gas, estimate_with_annotations, get_gas_estimator
-from translation_service import dump_translation, perform_translation
+from gas_estimator import (
+    estimate_all_functions,
+    estimate_gas,
+    estimate_with_annotations,
+    iter_all_functions,
+)
+from translation_service import (
+    TRANSLATION_BATCH_MAX,
+    close_client,
+    perform_translation,
+    perform_translation_batch,
+    queue_dump,
+    start_dump_writer,
+    stop_dump_writer,
+    stop_logging,
+    warm_up_client,
+)
+
 
-load_dotenv()
+# Translation request logs go through the queue-backed logger of translation_service, off the event loop
+translation_logger = logging.getLogger("translation")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Establish pooled connections to the LLM backend in the background, startup never waits for the LLM provider
+    warm_up = asyncio.create_task(warm_up_client())
+    start_dump_writer()
+    yield
+    warm_up.cancel()
+    await stop_dump_writer()
+    # Release pooled keep-alive connections to the LLM backend
+    await close_client()
+    stop_logging()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware to allow all origins
 app.add_middleware(
@@ -39,6 +78,49 @@ app.add_middleware(
 )
 
 
+# Headers of streamed responses, preventing proxies from buffering chunks so they reach the client as produced
+STREAMING_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # Disable NGINX buffering
+    "Connection": "keep-alive",
+}
+
+
+# Paths whose (non-streaming) JSON responses are large enough to be worth compressing.
+# Streaming endpoints are left out on purpose, gzip would hold back chunks until its buffer fills.
+GZIP_PATHS = frozenset({
+    "/api/translate",
+    "/api/translate/batch",
+    "/api/gas/estimate",
+    "/api/gas/estimate/all",
+    "/api/gas/estimate/annotated",
+})
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that only compresses responses of GZIP_PATHS."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] not in GZIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+
+def _is_blank(text: str) -> bool:
+    """Checks whether the text is empty or whitespace only, without making a stripped copy."""
+    return not text or text.isspace()
+
+
+def _gas_response_from_result(result: dict) -> GasEstimateResponse:
+    """Builds a GasEstimateResponse from estimator output, skipping validation of data we produced ourselves."""
+    breakdown = [GasOperationBreakdown.model_construct(**item) for item in result["breakdown"]]
+    return GasEstimateResponse.model_construct(**{**result, "breakdown": breakdown})
+
+
 @app.post("/api/translate")
 async def translate_code(request: TranslateRequest):
     """
@@ -47,26 +129,28 @@ async def translate_code(request: TranslateRequest):
     source_code = request.source_code
     options = request.options
 
-    print(f"Received translation request with options: {options}")
+    translation_logger.info(f"Received translation request with options: {options}")
 
-    if not source_code.strip():
+    if _is_blank(source_code):
         raise HTTPException(status_code=400, detail="Please provide EVM code for translation.")
 
-    # Call the translation service
-    translated_code = ""
-    reasoning = ""
+    # Call the translation service, chunks are collected in lists and joined once at the end
+    code_parts = []
+    reasoning_parts = []
     all_warnings = []
     all_errors = []
     async for chunk, reasoning_chunk, warnings, errors in perform_translation(
         request, stream=False  # Ensure streaming is off for this endpoint
     ):
-        translated_code += chunk
-        reasoning += reasoning_chunk
+        code_parts.append(chunk)
+        reasoning_parts.append(reasoning_chunk)
         all_warnings.extend(warnings)
         all_errors.extend(errors)
+    translated_code = "".join(code_parts)
+    reasoning = "".join(reasoning_parts)
 
     if all_errors:
-        print(f"Translation failed with errors: {all_errors}")
+        translation_logger.error(f"Translation failed with errors: {all_errors}")
         raise HTTPException(
             status_code=500, detail={"message": "Translation failed due to internal errors.", "errors": all_errors}
         )
@@ -83,29 +167,38 @@ async def translate_code_stream(request: TranslateRequest):
     """
     source_code = request.source_code
 
-    if not source_code.strip():
+    if _is_blank(source_code):
         raise HTTPException(status_code=400, detail="Please provide EVM code for translation.")
 
     async def translation_generator():
-        complete_code = ""
+        code_parts = []
         async for chunk, reasoning, warnings, errors in perform_translation(request, stream=True):
-            complete_code += chunk
+            code_parts.append(chunk)
             data = {"translated_code": chunk, "reasoning_chunk": reasoning, "warnings": warnings, "errors": errors}
-            yield json.dumps(data) + "\n"
-        # Dump translation to file
-        dump_translation(request, complete_code)
-
-    # Headers to prevent proxy buffering and ensure proper streaming
-    headers = {
-        "Cache-Control": "no-cache",
-        "X-Accel-Buffering": "no",  # Disable NGINX buffering
-        "Connection": "keep-alive",
-    }
-    return StreamingResponse(
-        translation_generator(), 
-        media_type="application/json",
-        headers=headers
-    )
+            # Encoded straight to bytes, the response does not have to encode the line again
+            yield orjson.dumps(data) + b"\n"
+        # Dump translation to file, written in the background
+        queue_dump(request, "".join(code_parts))
+
+    return StreamingResponse(translation_generator(), media_type="application/json", headers=STREAMING_HEADERS)
+
+
+@app.post("/api/translate/batch")
+async def translate_code_batch(request: TranslateBatchRequest):
+    """
+    Translates several independent EVM contracts concurrently, results are returned in request order.
+    """
+    if not request.requests:
+        raise HTTPException(status_code=400, detail="Please provide at least one translation request.")
+    if len(request.requests) > TRANSLATION_BATCH_MAX:
+        raise HTTPException(
+            status_code=400, detail=f"Please provide at most {TRANSLATION_BATCH_MAX} translation requests per batch."
+        )
+    if any(_is_blank(translate_request.source_code) for translate_request in request.requests):
+        raise HTTPException(status_code=400, detail="Please provide EVM code for every translation request.")
+
+    results = await perform_translation_batch(request.requests)
+    return TranslateBatchResponse(results=results)
 
 
 @app.get("/api/health")
@@ -135,7 +228,7 @@ async def estimate_gas_endpoint(request: GasEstimateRequest):
     Returns:
         Detailed gas estimation with breakdown and cost in ALPH
     """
-    if not request.ralph_code.strip():
+    if _is_blank(request.ralph_code):
         raise HTTPException(status_code=400, detail="Please provide Ralph code for gas estimation.")
     
     try:
@@ -148,6 +241,27 @@ async def estimate_gas_endpoint(request: GasEstimateRequest):
         raise HTTPException(status_code=500, detail=f"Gas estimation failed: {str(e)}")
 
 
+def _gas_summary_row(func_name: str, total_gas: int, estimated_cost_alph: float) -> str:
+    """Formats one row of the function comparison table."""
+    return f"| `{func_name}` | {total_gas:,} | {estimated_cost_alph:.10f} |"
+
+
+def _gas_summary_report(rows: List[str]) -> str:
+    """Builds the markdown summary report from table rows, already sorted by gas."""
+    return "\n".join([
+        "# Gas Estimation Summary",
+        "",
+        "## Function Comparison",
+        "",
+        "| Function | Total Gas | Est. Cost (ALPH) |",
+        "|----------|-----------|------------------|",
+        *rows,
+        "",
+        "---",
+        f"*Analyzed {len(rows)} function(s)*",
+    ])
+
+
 @app.post("/api/gas/estimate/all", response_model=GasEstimateAllFunctionsResponse)
 async def estimate_all_functions_endpoint(request: GasEstimateRequest):
     """
@@ -162,7 +276,7 @@ async def estimate_all_functions_endpoint(request: GasEstimateRequest):
     Returns:
         Gas estimation for each function with summary
     """
-    if not request.ralph_code.strip():
+    if _is_blank(request.ralph_code):
         raise HTTPException(status_code=400, detail="Please provide Ralph code for gas estimation.")
     
     try:
@@ -171,36 +285,16 @@ async def estimate_all_functions_endpoint(request: GasEstimateRequest):
         if not results:
             raise HTTPException(status_code=400, detail="No functions found in the provided Ralph code.")
         
-        # Build response
+        # Build response and summary rows in one pass, most expensive functions first
         functions = {}
-        for func_name, result in results.items():
-            functions[func_name] = GasEstimateResponse(**result)
-        
-        # Generate summary report
-        estimator = get_gas_estimator()
-        summary_lines = [
-            "# Gas Estimation Summary",
-            "",
-            "## Function Comparison",
-            "",
-            "| Function | Total Gas | Est. Cost (ALPH) |",
-            "|----------|-----------|------------------|",
-        ]
-        
-        for func_name, response in sorted(functions.items(), key=lambda x: -x[1].total_gas):
-            summary_lines.append(
-                f"| `{func_name}` | {response.total_gas:,} | {response.estimated_cost_alph:.10f} |"
-            )
-        
-        summary_lines.extend([
-            "",
-            "---",
-            f"*Analyzed {len(functions)} function(s)*",
-        ])
+        summary_rows = []
+        for func_name, result in sorted(results.items(), key=lambda x: -x[1]["total_gas"]):
+            functions[func_name] = _gas_response_from_result(result)
+            summary_rows.append(_gas_summary_row(func_name, result["total_gas"], result["estimated_cost_alph"]))
         
         return GasEstimateAllFunctionsResponse(
             functions=functions,
-            summary_report="\n".join(summary_lines)
+            summary_report=_gas_summary_report(summary_rows)
         )
     except HTTPException:
         raise
@@ -208,6 +302,52 @@ async def estimate_all_functions_endpoint(request: GasEstimateRequest):
         raise HTTPException(status_code=500, detail=f"Gas estimation failed: {str(e)}")
 
 
+@app.post("/api/gas/estimate/all/stream")
+async def estimate_all_functions_stream_endpoint(request: GasEstimateRequest):
+    """
+    Stream gas estimates for ALL functions in a Ralph contract as NDJSON.
+    
+    Each function's estimate is sent as soon as it is computed, so large
+    contracts can be rendered incrementally. The last line holds the summary.
+    
+    Args:
+        request: Contains ralph_code (function_name is ignored)
+    
+    Returns:
+        Streaming response with one {"function", "result"} line per function
+        followed by a {"summary_report"} line, or an {"error"} line if estimation fails midway
+    """
+    if _is_blank(request.ralph_code):
+        raise HTTPException(status_code=400, detail="Please provide Ralph code for gas estimation.")
+    
+    results = iter_all_functions(request.ralph_code)
+    try:
+        first = next(results, None)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Gas estimation failed: {str(e)}")
+    
+    if first is None:
+        raise HTTPException(status_code=400, detail="No functions found in the provided Ralph code.")
+    
+    # Sync generator, so Starlette runs the estimation in its threadpool instead of on the event loop
+    def estimate_generator():
+        summary = []
+        try:
+            for func_name, result in itertools.chain((first,), results):
+                summary.append((result["total_gas"], func_name, result["estimated_cost_alph"]))
+                yield orjson.dumps({"function": func_name, "result": result}) + b"\n"
+
+            summary.sort(key=lambda x: -x[0])
+            summary_rows = [_gas_summary_row(func_name, total_gas, cost) for total_gas, func_name, cost in summary]
+            yield orjson.dumps({"summary_report": _gas_summary_report(summary_rows)}) + b"\n"
+        except Exception as e:
+            # Headers are already sent, the failure is reported as the last line instead of truncating the body
+            logger.error(f"Gas estimation streaming error: {e}", exc_info=True)
+            yield orjson.dumps({"error": f"Gas estimation failed: {str(e)}"}) + b"\n"
+    
+    return StreamingResponse(estimate_generator(), media_type="application/x-ndjson", headers=STREAMING_HEADERS)
+
+
 from api_types import GasAnnotatedResponse
 
 
@@ -225,7 +365,7 @@ async def estimate_annotated_endpoint(request: GasEstimateRequest):
     Returns:
         Annotated gas estimates with line positions for each function
     """
-    if not request.ralph_code.strip():
+    if _is_blank(request.ralph_code):
         raise HTTPException(status_code=400, detail="Please provide Ralph code for gas estimation.")
     
     try:
@@ -291,7 +431,6 @@ async def get_gas_constants():
     }
 
 
-import logging
 from datetime import datetime
 
 # Chat endpoints
@@ -322,13 +461,7 @@ async def chat_stream(request: ChatRequest):
             error_event = {"type": "error", "data": {"message": str(e)}}
             yield json.dumps(error_event) + "\n"
 
-    # Headers to prevent proxy buffering and ensure proper streaming
-    headers = {
-        "Cache-Control": "no-cache",
-        "X-Accel-Buffering": "no",  # Disable NGINX buffering
-        "Connection": "keep-alive",
-    }
-    return StreamingResponse(chat_generator(), media_type="application/json", headers=headers)
+    return StreamingResponse(chat_generator(), media_type="application/json", headers=STREAMING_HEADERS)
 
 
 @app.post("/api/chat", response_model=ChatResponse)
@@ -339,7 +472,7 @@ async def chat(request: ChatRequest):
     """
     agent = get_agent()
 
-    response_text = ""
+    response_parts = []
     try:
         async for event in agent.chat(
             message=request.message,
@@ -348,13 +481,13 @@ async def chat(request: ChatRequest):
             options=request.options,  # Pass options to agent
         ):
             if event.get("type") == "content":
-                response_text += event.get("data", "")
+                response_parts.append(event.get("data", ""))
     except Exception as e:
         logger.error(f"Chat error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
     return ChatResponse(
-        message=response_text, session_id=request.session_id or "default", timestamp=datetime.utcnow().isoformat()
+        message="".join(response_parts), session_id=request.session_id or "default", timestamp=datetime.utcnow().isoformat()
     )
 
 
@@ -387,10 +520,10 @@ async def fix_code(request: FixCodeRequest):
     Returns:
         Streaming response with stage events and final result
     """
-    if not request.ralph_code.strip():
+    if _is_blank(request.ralph_code):
         raise HTTPException(status_code=400, detail="Please provide Ralph code to fix.")
     
-    if not request.error.strip():
+    if _is_blank(request.error):
         raise HTTPException(status_code=400, detail="Please provide the compilation error.")
     
     agent = get_agent()
@@ -409,5 +542,5 @@ async def fix_code(request: FixCodeRequest):
             error_event = {"type": "error", "data": {"message": str(e)}}
             yield json.dumps(error_event) + "\n"
     
-    return StreamingResponse(fix_generator(), media_type="application/x-ndjson")
+    return StreamingResponse(fix_generator(), media_type="application/x-ndjson", headers=STREAMING_HEADERS)
 
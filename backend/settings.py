@@ -0,0 +1,88 @@
+"""
+Backend configuration, read from the environment (and `.env`) once at import.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class Settings:
+    api_key: Optional[str]
+    # LLM API root, API_URL may be configured as a full chat completions endpoint
+    api_url: str
+    base_url: str
+    # (base_url, api_key) pairs that translation requests are spread over in turn
+    llm_endpoints: tuple[tuple[str, Optional[str]], ...]
+    llm_model: Optional[str]
+    smart_llm_model: Optional[str]
+    agent_model: str
+    # Alephium full node used to compile Ralph code
+    node_url: str
+    log_level: str
+    # Upper bound of LLM requests streaming at the same time, further requests wait for a free slot
+    llm_max_concurrency: int
+    # Connection pool of the shared LLM client
+    llm_max_connections: int
+    llm_max_keepalive: int
+    # Retries of rate limited (429), failed (5xx) or dropped LLM requests, with the client's exponential backoff
+    llm_max_retries: int
+    # Streamed deltas are merged and yielded once this many have arrived or this many milliseconds have passed
+    stream_batch_size: int
+    stream_max_ms: int
+    # Number of completed translations kept in memory, repeated requests are answered without calling the LLM
+    translation_cache_size: int
+    # Upper bound of translation requests in one batch request
+    translation_batch_max: int
+
+
+def _split_list(value: Optional[str]) -> list[str]:
+    """Splits a comma-separated environment value, ignoring blank entries."""
+    return [item.strip() for item in value.split(",") if item.strip()] if value else []
+
+
+def _base_url(api_url: str) -> str:
+    """Returns the API root of `api_url`, which may be configured as a full chat completions endpoint."""
+    return api_url.rstrip("/").removesuffix("/chat/completions")
+
+
+def load_settings() -> Settings:
+    """Reads the settings from the environment variables."""
+    api_url = os.getenv("API_URL", "https://openrouter.ai/api/v1")
+    api_key = os.getenv("API_KEY")
+    # API_URLS and API_KEYS are optional comma-separated lists, a single entry is paired with every entry of the other
+    api_urls = _split_list(os.getenv("API_URLS")) or [api_url]
+    api_keys = _split_list(os.getenv("API_KEYS")) or [api_key]
+    if len(api_urls) == 1:
+        api_urls *= len(api_keys)
+    if len(api_keys) == 1:
+        api_keys *= len(api_urls)
+    if len(api_urls) != len(api_keys):
+        raise RuntimeError("API_URLS and API_KEYS must have the same number of entries.")
+    return Settings(
+        api_key=api_key,
+        api_url=api_url,
+        base_url=_base_url(api_url),
+        llm_endpoints=tuple((_base_url(url), key) for url, key in zip(api_urls, api_keys)),
+        llm_model=os.getenv("LLM_MODEL"),
+        smart_llm_model=os.getenv("SMART_LLM_MODEL"),
+        agent_model=os.getenv("AGENT_MODEL", "mistralai/mistral-small-3.2-24b-instruct"),
+        node_url=os.getenv("NODE_URL", "https://node.testnet.alephium.org"),
+        log_level=os.getenv("LOG_LEVEL", "INFO"),
+        llm_max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+        llm_max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "512")),
+        llm_max_keepalive=int(os.getenv("LLM_MAX_KEEPALIVE", "256")),
+        llm_max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+        stream_batch_size=int(os.getenv("STREAM_BATCH_SIZE", "16")),
+        stream_max_ms=int(os.getenv("STREAM_MAX_MS", "25")),
+        translation_cache_size=int(os.getenv("TRANSLATION_CACHE_SIZE", "128")),
+        translation_batch_max=int(os.getenv("TRANSLATION_BATCH_MAX", "16")),
+    )
+
+
+SETTINGS = load_settings()
@@ -1,3 +1,5 @@
+from functools import cache
+
 USER_PROMPT_TEMPLATE = (
     "--- EVM Code to Translate ---\n{source_code}\n--- End EVM Code ---\n\n"
     'Now, translate the above EVM code. There is no limit to how long the output can be. IMPORTANT: Only provide the resulting Ralph code WITHOUT "```ralph" markdown or any other information. '
@@ -17,21 +19,30 @@ USER_PROMPT_TEMPLATE = (
 ERC20_NOTICE = "Translate ERC20 transfers and approvals to native Alephium tokens. Translate token addresses to `ByteVec`.  Comment out other calls to IERC20 methods and notice that they are unsupported."
 
 
-def get_user_prompt(
-    optimize: bool, include_comments: bool, mimic_defaults: bool, translate_erc20: bool, source_code: str
-) -> str:
+@cache
+def _user_prompt_parts(include_comments: bool, mimic_defaults: bool, translate_erc20: bool) -> tuple[str, str]:
     """
-    Generates the user prompt for translation based on the provided options.
+    Renders USER_PROMPT_TEMPLATE for one combination of options, split into the text before and after the source code.
     """
-    return USER_PROMPT_TEMPLATE.format(
-        optimize=optimize,
+    head, _, tail = USER_PROMPT_TEMPLATE.partition("{source_code}")
+    return head, tail.format(
         include_comments=include_comments,
         mimic_defaults=mimic_defaults,
         translate_erc20=ERC20_NOTICE if translate_erc20 else "",
-        source_code=source_code,
     )
 
 
+def get_user_prompt(
+    optimize: bool, include_comments: bool, mimic_defaults: bool, translate_erc20: bool, source_code: str
+) -> str:
+    """
+    Generates the user prompt for translation based on the provided options.
+    The option text is rendered once per combination, only the source code is inserted per request.
+    """
+    head, tail = _user_prompt_parts(include_comments, mimic_defaults, translate_erc20)
+    return head + source_code + tail
+
+
 LOG_TEMPLATE = (
     "Translation request received with options: "
     "optimize={optimize}, include_comments={include_comments}, mimic_defaults={mimic_defaults}, translate_erc20={translate_erc20}. "
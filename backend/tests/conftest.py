@@ -0,0 +1,36 @@
+import asyncio
+import sys
+
+import pytest
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """Creates a uvloop loop when available (not supported on Windows), running new tasks eagerly (Python 3.12+)."""
+    loop = None
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            loop = uvloop.new_event_loop()
+    if loop is None:
+        loop = asyncio.new_event_loop()
+    if hasattr(asyncio, "eager_task_factory"):
+        # Mocked agent streams never block, eager tasks run them without a round trip through the scheduler
+        loop.set_task_factory(asyncio.eager_task_factory)
+    return loop
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Runs the async tests on the loops of _new_event_loop()."""
+    return {"default": _new_event_loop}
+
+
+@pytest.fixture(scope="session")
+def replacement_libs():
+    """The OpenZeppelin replacement libraries, loaded once per test session."""
+    from translate_oz import REPLACEMENT_LIBS
+
+    return REPLACEMENT_LIBS
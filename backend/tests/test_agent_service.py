@@ -21,6 +21,14 @@ def test_extract_ralph_code():
     code = "Here is some code:\n```ralph\nTxId txId\n```\nHope it helps!"
     assert _extract_ralph_code(code) == "TxId txId"
 
+    # Test with another language tag
+    code = "```rust\nTxId txId\n```"
+    assert _extract_ralph_code(code) == "TxId txId"
+
+    # Test with unclosed fence
+    code = "```ralph\nTxId txId"
+    assert _extract_ralph_code(code) == "TxId txId"
+
 def test_safe_parse_fields():
     # Test valid dicts
     fields = [{"name": "foo", "type": "U256"}, {"name": "bar", "type": "Address"}]
@@ -1,45 +1,46 @@
 import pytest
-import asyncio
-from unittest.mock import patch, MagicMock, AsyncMock
+from dataclasses import dataclass
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
 from agent_service import ChatAgent, StreamEvent
 
-@pytest.fixture
-def agent():
-    # Patch the LLM and base objects for all tests
-    with patch("agent_service.ChatOpenAI") as mock_llm:
-        # Mock LLM agent's astream_events to yield a sequence of events
-        mock_agent = MagicMock()
-        
-        async def fake_astream_events(*args, **kwargs):
-            yield {"event": "on_tool_start", "name": "createContract", "data": {"input": "{'name': 'MyContract'}"}, "run_id": "1"}
-            yield {"event": "on_tool_end", "name": "createContract", "success": True, "run_id": "1"}
-            yield {"event": "on_tool_start", "name": "translateFunctions", "data": {"input": "{'interfaceOrContractName': 'MyContract'}"}, "run_id": "2"}
-            yield {"event": "on_tool_end", "name": "translateFunctions", "success": True, "run_id": "2"}
-            yield {"event": "on_chat_model_stream", "data": {"chunk": MagicMock(content="Final thoughts from agent.")}}
-        
-        mock_agent.astream_events = fake_astream_events
-        # Patch ChatOpenAI to return a dummy llm
-        mock_llm.return_value = MagicMock()
-        
-        # Patch create_agent to return our mock agent
-        with patch("agent_service.create_agent", return_value=mock_agent):
-            yield ChatAgent()
+# All tests share the module-scoped agent and its sessions, keep them on one xdist worker
+pytestmark = pytest.mark.xdist_group("chat_agent")
+
+@dataclass(slots=True)
+class _Chunk:
+    # Stand-in for a chat model chunk, the agent only reads .content
+    content: str
+
+async def fake_astream_events(*args, **kwargs):
+    yield {"event": "on_tool_start", "name": "createContract", "data": {"input": "{'name': 'MyContract'}"}, "run_id": "1"}
+    yield {"event": "on_tool_end", "name": "createContract", "success": True, "run_id": "1"}
+    yield {"event": "on_tool_start", "name": "translateFunctions", "data": {"input": "{'interfaceOrContractName': 'MyContract'}"}, "run_id": "2"}
+    yield {"event": "on_tool_end", "name": "translateFunctions", "success": True, "run_id": "2"}
+    yield {"event": "on_chat_model_stream", "data": {"chunk": _Chunk("Final thoughts from agent.")}}
 
-def run_async(gen):
-    # Helper to run async generator and collect results
-    return asyncio.run(_collect_async(gen))
+def fake_llm(*args, **kwargs):
+    # Tests that use the LLM set ainvoke themselves
+    return SimpleNamespace(ainvoke=None)
 
-async def _collect_async(gen):
-    results = []
-    async for item in gen:
-        results.append(item)
-    return results
+def fake_create_agent(*args, **kwargs):
+    return SimpleNamespace(astream_events=fake_astream_events)
+
+@pytest.fixture(scope="module")
+def agent():
+    # Replace the LLM and base objects once for all tests in this module,
+    # tests that replace agent attributes restore them through monkeypatch
+    mp = pytest.MonkeyPatch()
+    mp.setattr("agent_service.ChatOpenAI", fake_llm)
+    mp.setattr("agent_service.create_agent", fake_create_agent)
+    yield ChatAgent()
+    mp.undo()
 
-def test_chat_event_sequence(agent):
+async def test_chat_event_sequence(agent):
     # Test that the chat method yields the expected event sequence
     message = "contract MyContract {}"
     # We need to set a session ID and source
-    events = run_async(agent.chat(message, session_id="test1", stream=True, options={"smart": True}))
+    events = [e async for e in agent.chat(message, session_id="test1", stream=True, options={"smart": True})]
     
     # Check for expected event types
     event_types = [e["type"] for e in events]
@@ -57,15 +58,15 @@ def test_chat_event_sequence(agent):
     assert any(t["data"]["tool"] == "createContract" for t in tool_starts)
     assert any(t["data"]["tool"] == "translateFunctions" for t in tool_starts)
 
-def test_chat_error_handling(agent):
+async def test_chat_error_handling(agent, monkeypatch):
     # Patch agent.agent.astream_events to raise an exception
     async def error_gen(*args, **kwargs):
         raise Exception("Agent failed")
         yield
-    agent.agent.astream_events = error_gen
+    monkeypatch.setattr(agent.agent, "astream_events", error_gen)
     
     message = "contract Failed {}"
-    events = run_async(agent.chat(message, session_id="errtest", stream=True))
+    events = [e async for e in agent.chat(message, session_id="errtest", stream=True)]
     
     assert any(e["type"] == "error" for e in events)
     error_event = next(e for e in events if e["type"] == "error")
@@ -80,38 +81,28 @@ def test_session_management(agent):
     agent.clear_session("sess1")
     assert agent.get_session_options("sess1") != opts # Should return defaults
 
-@pytest.mark.asyncio
-async def test_fix_code_success(agent):
+async def test_fix_code_success(agent, monkeypatch):
     # Mock the fix_llm response
-    mock_response = MagicMock()
-    mock_response.content = "fixed Ralph code"
-    agent.fix_llm.ainvoke = AsyncMock(return_value=mock_response)
+    mock_response = SimpleNamespace(content="fixed Ralph code")
+    monkeypatch.setattr(agent.fix_llm, "ainvoke", AsyncMock(return_value=mock_response))
     
     # Mock the compilation check
     with patch.object(agent, "_compile_ralph_code", return_value={"success": True}) as mock_compile:
-        gen = agent.fix_code("broken code", "error message")
-        events = []
-        async for e in gen:
-            events.append(e)
+        events = [e async for e in agent.fix_code("broken code", "error message")]
             
         assert any(e["type"] == "stage" and e["data"]["stage"] == "fixing" for e in events)
         assert any(e["type"] == "result" and e["data"]["success"] is True for e in events)
         result_event = next(e for e in events if e["type"] == "result")
         assert result_event["data"]["fixed_code"] == "fixed Ralph code"
 
-@pytest.mark.asyncio
-async def test_fix_code_failure(agent):
+async def test_fix_code_failure(agent, monkeypatch):
     # Mock the fix_llm response
-    mock_response = MagicMock()
-    mock_response.content = "still broken code"
-    agent.fix_llm.ainvoke = AsyncMock(return_value=mock_response)
+    mock_response = SimpleNamespace(content="still broken code")
+    monkeypatch.setattr(agent.fix_llm, "ainvoke", AsyncMock(return_value=mock_response))
     
     # Mock the compilation check to always fail
     with patch.object(agent, "_compile_ralph_code", return_value={"success": False, "error": "still bad"}) as mock_compile:
-        gen = agent.fix_code("broken code", "error message", max_iterations=2)
-        events = []
-        async for e in gen:
-            events.append(e)
+        events = [e async for e in agent.fix_code("broken code", "error message", max_iterations=2)]
             
         assert any(e["type"] == "result" and e["data"]["success"] is False for e in events)
         result_event = next(e for e in events if e["type"] == "result")
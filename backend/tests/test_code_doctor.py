@@ -1,34 +1,240 @@
+import re
+
+import pytest
+
 from code_doctor import fix_common_errors
 
+_ENUM_WITHOUT_COMMAS = """Contract Test() {
+  enum State {
+    Init = 0
+    Active = 1
+  }
+}"""
 
-class TestEnumFixes:
-    """Tests for enum comma removal."""
-    
-    def test_removes_trailing_commas_from_enum(self):
-        code = """Contract Test() {
+_ENUM_CASES = [
+    pytest.param(
+        """Contract Test() {
   enum State {
     Init = 0,
     Active = 1,
   }
-}"""
-        expected = """Contract Test() {
-  enum State {
-    Init = 0
-    Active = 1
+}""",
+        _ENUM_WITHOUT_COMMAS,
+        id="removes_trailing_commas",
+    ),
+    pytest.param(_ENUM_WITHOUT_COMMAS, _ENUM_WITHOUT_COMMAS, id="preserves_enum_without_commas"),
+]
+
+_PRESERVED_UNDERSCORE_CASES = [
+    pytest.param(
+        """fn test() -> () {
+  let msg = "_hello_world"
+}""",
+        '"_hello_world"',
+        id="strings",
+    ),
+    pytest.param(
+        """fn test() -> () {
+  // _this_is_a_comment
+  let x = 1
+}""",
+        "// _this_is_a_comment",
+        id="comments",
+    ),
+    pytest.param(
+        """fn test() -> () {
+  let msg = b`_hello`
+}""",
+        "b`_hello`",
+        id="backtick_strings",
+    ),
+]
+
+# Larger multi-function sources of the scenario tests
+_CODE_FULL_CONTRACT = """Contract Token(mut supply: U256, owner: Address) {
+  enum ErrorCodes {
+    NotOwner = 1,
+    InvalidAmount = 2,
+  }
+  
+  pub fn mint(_to: Address, _amount: U256) -> () {
+    checkCaller!(callerAddress!() == owner, ErrorCodes.NotOwner)
+    transferTokenFromSelf!(_to, selfTokenId!(), _amount)
+    supply = supply + _amount
+  }
+  
+  pub fn deposit(_from: Address, _amount: U256) -> () {
+    transferTokenToSelf!(_from, selfTokenId!(), _amount)
+  }
+  
+  fn _innerBurn(amount: U256) -> () {
+    supply = supply - amount
   }
 }"""
-        result = fix_common_errors(code)
-        assert result == expected
+
+_CODE_SIMPLE_BANK = """  @using(checkExternalCaller = false, preapprovedAssets = true, payToContractOnly = true)
+  pub fn deposit(amount: U256) -> () {
+    assert!(amount > 0, DEPOSIT_AMOUNT_MUST_BE_GREATER_THAN_ZERO)
+    // @@@ Native assets are transferred to the contract using transferTokenToSelf! with preapprovedAssets.
+    transferTokenToSelf!(callerAddress!(), ALPH, amount)
+
+    let sender = callerAddress!()
+    if (balances.contains!(sender)) {
+      balances[sender] = balances[sender] + amount
+    } else {
+      // @@@ Ralph requires a storage deposit of 0.1 ALPH for each entry in the mapping.
+      balances.insert!(sender, sender, amount)
+    }
+    emit Deposit(sender, amount)
+  }
+
+  @using(checkExternalCaller = false, assetsInContract = true)
+  pub fn withdraw(amount: U256) -> () {
+    let sender = callerAddress!()
+    assert!(balances.contains!(sender), INSUFFICIENT_BALANCE)
+    let currentBalance = balances[sender]
+    assert!(currentBalance >= amount, INSUFFICIENT_BALANCE)
     
-    def test_preserves_enum_without_commas(self):
-        code = """Contract Test() {
-  enum State {
-    Init = 0
-    Active = 1
+    balances[sender] = currentBalance - amount
+    // @@@ Reentrancy is prevented at the VM level in Alephium, so manual guards are unnecessary.
+    transferTokenFromSelf!(sender, ALPH, amount)
+    
+    emit Withdrawal(sender, amount)
   }
-}"""
+
+  @using(checkExternalCaller = false, preapprovedAssets = true)
+  pub fn transfer(to: Address, amount: U256) -> () {
+    assert!(to != nullContractAddress!(), INVALID_RECIPIENT)
+    let sender = callerAddress!()
+    assert!(balances.contains!(sender), INSUFFICIENT_BALANCE)
+    
+    let senderBalance = balances[sender]
+    assert!(senderBalance >= amount, INSUFFICIENT_BALANCE)
+    
+    balances[sender] = senderBalance - amount
+    
+    if (balances.contains!(to)) {
+      balances[to] = balances[to] + amount
+    } else {
+      // @@@ In simple logic, the sender pays the storage deposit for the recipient's map entry.
+      balances.insert!(sender, to, amount)
+    }
+    
+    emit Transfer(sender, to, amount)
+  }
+"""
+
+# Functions that need a single annotation property, as (code, expected property)
+_ANNOTATION_CASES = [
+    pytest.param(
+        """Contract Test() {
+  pub fn withdraw(to: Address) -> () {
+    transferTokenFromSelf!(to, tokenId, 100)
+  }
+}""",
+        "assetsInContract = true",
+        id="assets_in_contract_for_transfer_from_self",
+    ),
+    pytest.param(
+        """Contract Test() {
+  pub fn deposit(from: Address) -> () {
+    transferTokenToSelf!(from, tokenId, 100)
+  }
+}""",
+        "preapprovedAssets = true",
+        id="preapproved_assets_for_transfer_to_self",
+    ),
+    pytest.param(
+        """Contract Test() {
+  pub fn getBalance() -> U256 {
+    return tokenRemaining!(selfAddress!(), tokenId)
+  }
+}""",
+        "assetsInContract = true",
+        id="assets_in_contract_for_token_remaining_self",
+    ),
+    pytest.param(
+        """Contract Test(mut counter: U256) {
+  pub fn increment() -> () {
+    counter = counter + 1
+  }
+}""",
+        "updateFields = true",
+        id="update_fields_for_mutable_field_assignment",
+    ),
+    pytest.param(
+        """Contract Test() {
+  mapping[Address, U256] balances
+  
+  pub fn withdraw(amount: U256) -> () {
+    let sender = callerAddress!()
+    balances[sender] = balances[sender] - amount
+  }
+}""",
+        "updateFields = true",
+        id="update_fields_for_mapping_assignment",
+    ),
+    pytest.param(
+        """Contract SimpleBank() {
+  mapping[Address, U256] balances
+
+  pub fn transfer(to: Address, amount: U256) -> () {
+    let sender = callerAddress!()
+    balances[sender] = balances[sender] - amount
+    balances[to] = balances[to] + amount
+  }
+}""",
+        "updateFields = true",
+        id="update_fields_for_main_scope_mapping_assignment",
+    ),
+    pytest.param(
+        """Contract Test() {
+  mapping[Address, U256] balances
+  
+  pub fn setBalance(addr: Address, amount: U256) -> () {
+    balances.insert!(addr, amount)
+  }
+}""",
+        "preapprovedAssets = true",
+        id="preapproved_assets_for_map_insert",
+    ),
+    pytest.param(
+        """Contract Test(mut val: U256) {
+  pub fn update(newVal: U256) -> () {
+    val = newVal
+  }
+}""",
+        "checkExternalCaller = false",
+        id="check_external_caller_false_for_public_without_check_caller",
+    ),
+    pytest.param(
+        """Contract Test() {
+  pub fn transfer(from: Address, to: Address) -> () {
+    transferToken!(from, to, tokenId, 100)
+  }
+}""",
+        "preapprovedAssets = true",
+        id="preapproved_assets_for_transfer_token",
+    ),
+    pytest.param(
+        """Contract Test() {
+  pub fn deploy(caller: Address, bytecode: ByteVec) -> ByteVec {
+    return createContract!{caller -> ALPH: 1 alph}(bytecode, #, #)
+  }
+}""",
+        "preapprovedAssets = true",
+        id="preapproved_assets_for_create_contract",
+    ),
+]
+
+
+class TestEnumFixes:
+    """Tests for enum comma removal."""
+    
+    @pytest.mark.parametrize("code, expected", _ENUM_CASES)
+    def test_enum_trailing_commas(self, code, expected):
         result = fix_common_errors(code)
-        assert result == code
+        assert result == expected
 
 
 class TestUnderscoreFixes:
@@ -44,27 +250,11 @@ class TestUnderscoreFixes:
         assert "_param" not in result
         assert "_local" not in result
     
-    def test_preserves_underscores_in_strings(self):
-        code = """fn test() -> () {
-  let msg = "_hello_world"
-}"""
+    @pytest.mark.parametrize("code, expected", _PRESERVED_UNDERSCORE_CASES)
+    def test_preserves_underscores(self, code, expected):
         result = fix_common_errors(code)
-        assert '"_hello_world"' in result
+        assert expected in result
     
-    def test_preserves_underscores_in_comments(self):
-        code = """fn test() -> () {
-  // _this_is_a_comment
-  let x = 1
-}"""
-        result = fix_common_errors(code)
-        assert "// _this_is_a_comment" in result
-    
-    def test_preserves_underscores_in_backtick_strings(self):
-        code = """fn test() -> () {
-  let msg = b`_hello`
-}"""
-        result = fix_common_errors(code)
-        assert "b`_hello`" in result
 
 
 class TestMapInsertFixes:
@@ -89,53 +279,10 @@ class TestMapInsertFixes:
 class TestAnnotationFixes:
     """Tests for @using annotation fixes."""
     
-    def test_adds_assets_in_contract_for_transfer_from_self(self):
-        code = """Contract Test() {
-  pub fn withdraw(to: Address) -> () {
-    transferTokenFromSelf!(to, tokenId, 100)
-  }
-}"""
-        result = fix_common_errors(code)
-        assert "assetsInContract = true" in result
-    
-    def test_adds_preapproved_assets_for_transfer_to_self(self):
-        code = """Contract Test() {
-  pub fn deposit(from: Address) -> () {
-    transferTokenToSelf!(from, tokenId, 100)
-  }
-}"""
-        result = fix_common_errors(code)
-        assert "preapprovedAssets = true" in result
-    
-    def test_adds_assets_in_contract_for_token_remaining_self(self):
-        code = """Contract Test() {
-  pub fn getBalance() -> U256 {
-    return tokenRemaining!(selfAddress!(), tokenId)
-  }
-}"""
+    @pytest.mark.parametrize("code, expected", _ANNOTATION_CASES)
+    def test_adds_required_annotation(self, code, expected):
         result = fix_common_errors(code)
-        assert "assetsInContract = true" in result
-    
-    def test_adds_update_fields_for_mutable_field_assignment(self):
-        code = """Contract Test(mut counter: U256) {
-  pub fn increment() -> () {
-    counter = counter + 1
-  }
-}"""
-        result = fix_common_errors(code)
-        assert "updateFields = true" in result
-    
-    def test_adds_update_fields_for_mapping_assignment(self):
-        code = """Contract Test() {
-  mapping[Address, U256] balances
-  
-  pub fn withdraw(amount: U256) -> () {
-    let sender = callerAddress!()
-    balances[sender] = balances[sender] - amount
-  }
-}"""
-        result = fix_common_errors(code)
-        assert "updateFields = true" in result
+        assert expected in result
     
     def test_simple_bank_deposit_no_update_fields_nested(self):
         """Test that deposit function with mapping assignment INSIDE if block does NOT get updateFields.
@@ -166,41 +313,6 @@ class TestAnnotationFixes:
             if 'pub fn deposit' in line:
                 assert line.startswith('  '), f"Expected 2-space indent, got: '{line}'"
     
-    def test_main_scope_mapping_assignment_gets_update_fields(self):
-        """Test that mapping assignment at MAIN SCOPE does get updateFields = true."""
-        code = """Contract SimpleBank() {
-  mapping[Address, U256] balances
-
-  pub fn transfer(to: Address, amount: U256) -> () {
-    let sender = callerAddress!()
-    balances[sender] = balances[sender] - amount
-    balances[to] = balances[to] + amount
-  }
-}"""
-        result = fix_common_errors(code)
-        # updateFields IS needed because assignments are at main scope
-        assert "updateFields = true" in result
-    
-    def test_adds_preapproved_assets_for_map_insert(self):
-        code = """Contract Test() {
-  mapping[Address, U256] balances
-  
-  pub fn setBalance(addr: Address, amount: U256) -> () {
-    balances.insert!(addr, amount)
-  }
-}"""
-        result = fix_common_errors(code)
-        assert "preapprovedAssets = true" in result
-    
-    def test_adds_check_external_caller_false_for_public_without_check_caller(self):
-        code = """Contract Test(mut val: U256) {
-  pub fn update(newVal: U256) -> () {
-    val = newVal
-  }
-}"""
-        result = fix_common_errors(code)
-        assert "checkExternalCaller = false" in result
-    
     def test_no_check_external_caller_for_private_function(self):
         code = """Contract Test(mut val: U256) {
   fn innerUpdate(newVal: U256) -> () {
@@ -257,24 +369,6 @@ class TestAnnotationFixes:
         assert "assetsInContract = true" in result
         assert "payToContractOnly = true" not in result
     
-    def test_adds_preapproved_assets_for_transfer_token(self):
-        code = """Contract Test() {
-  pub fn transfer(from: Address, to: Address) -> () {
-    transferToken!(from, to, tokenId, 100)
-  }
-}"""
-        result = fix_common_errors(code)
-        assert "preapprovedAssets = true" in result
-    
-    def test_adds_preapproved_assets_for_create_contract(self):
-        code = """Contract Test() {
-  pub fn deploy(caller: Address, bytecode: ByteVec) -> ByteVec {
-    return createContract!{caller -> ALPH: 1 alph}(bytecode, #, #)
-  }
-}"""
-        result = fix_common_errors(code)
-        assert "preapprovedAssets = true" in result
-    
     def test_preserves_indentation(self):
         code = """Contract Test(mut val: U256) {
   pub fn update() -> () {
@@ -294,26 +388,7 @@ class TestComplexScenarios:
     """Tests for complex real-world scenarios."""
     
     def test_full_contract_fix(self):
-        code = """Contract Token(mut supply: U256, owner: Address) {
-  enum ErrorCodes {
-    NotOwner = 1,
-    InvalidAmount = 2,
-  }
-  
-  pub fn mint(_to: Address, _amount: U256) -> () {
-    checkCaller!(callerAddress!() == owner, ErrorCodes.NotOwner)
-    transferTokenFromSelf!(_to, selfTokenId!(), _amount)
-    supply = supply + _amount
-  }
-  
-  pub fn deposit(_from: Address, _amount: U256) -> () {
-    transferTokenToSelf!(_from, selfTokenId!(), _amount)
-  }
-  
-  fn _innerBurn(amount: U256) -> () {
-    supply = supply - amount
-  }
-}"""
+        code = _CODE_FULL_CONTRACT
         result = fix_common_errors(code)
         
         # Enum commas removed
@@ -397,62 +472,11 @@ Contract Second(mut count: U256) {
 
     def test_simple_bank_scope(self):
         """Test scenario to ensure updateFields is only added to main scope assignments."""
-        code = """  @using(checkExternalCaller = false, preapprovedAssets = true, payToContractOnly = true)
-  pub fn deposit(amount: U256) -> () {
-    assert!(amount > 0, DEPOSIT_AMOUNT_MUST_BE_GREATER_THAN_ZERO)
-    // @@@ Native assets are transferred to the contract using transferTokenToSelf! with preapprovedAssets.
-    transferTokenToSelf!(callerAddress!(), ALPH, amount)
-
-    let sender = callerAddress!()
-    if (balances.contains!(sender)) {
-      balances[sender] = balances[sender] + amount
-    } else {
-      // @@@ Ralph requires a storage deposit of 0.1 ALPH for each entry in the mapping.
-      balances.insert!(sender, sender, amount)
-    }
-    emit Deposit(sender, amount)
-  }
-
-  @using(checkExternalCaller = false, assetsInContract = true)
-  pub fn withdraw(amount: U256) -> () {
-    let sender = callerAddress!()
-    assert!(balances.contains!(sender), INSUFFICIENT_BALANCE)
-    let currentBalance = balances[sender]
-    assert!(currentBalance >= amount, INSUFFICIENT_BALANCE)
-    
-    balances[sender] = currentBalance - amount
-    // @@@ Reentrancy is prevented at the VM level in Alephium, so manual guards are unnecessary.
-    transferTokenFromSelf!(sender, ALPH, amount)
-    
-    emit Withdrawal(sender, amount)
-  }
-
-  @using(checkExternalCaller = false, preapprovedAssets = true)
-  pub fn transfer(to: Address, amount: U256) -> () {
-    assert!(to != nullContractAddress!(), INVALID_RECIPIENT)
-    let sender = callerAddress!()
-    assert!(balances.contains!(sender), INSUFFICIENT_BALANCE)
-    
-    let senderBalance = balances[sender]
-    assert!(senderBalance >= amount, INSUFFICIENT_BALANCE)
-    
-    balances[sender] = senderBalance - amount
-    
-    if (balances.contains!(to)) {
-      balances[to] = balances[to] + amount
-    } else {
-      // @@@ In simple logic, the sender pays the storage deposit for the recipient's map entry.
-      balances.insert!(sender, to, amount)
-    }
-    
-    emit Transfer(sender, to, amount)
-  }
-"""
+        code = _CODE_SIMPLE_BANK
         # Pass mapping names to simulate the agent service behavior
         result = fix_common_errors(code, mappings={'balances'})
         
         # Extract each function's @using annotation
-        import re
         functions = re.findall(r'(@using\([^)]+\)\s+pub fn \w+)', result)
         
         # Check that withdraw and transfer got updateFields = true
@@ -507,3 +531,17 @@ Contract Second(mut count: U256) {
         
         # Should add updateFields and checkExternalCaller=false since it modifies mappings and is public
         assert result == expected
+
+
+class TestFixCache:
+    """Tests for caching of fix results."""
+    
+    def test_mappings_are_part_of_cache_key(self):
+        code = """fn set(a: Address) -> () {
+    balances[a] = 1
+}"""
+        assert fix_common_errors(code) == code
+        assert "@using(updateFields = true)" in fix_common_errors(code, mappings={'balances'})
+        # Same mappings in another container hit the same entry
+        assert fix_common_errors(code, mappings=['balances']) == fix_common_errors(code, mappings={'balances'})
+        assert fix_common_errors(code) == code
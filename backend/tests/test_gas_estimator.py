@@ -0,0 +1,56 @@
+"""
+Unit tests for gas_estimator.py
+
+Tests cover:
+- estimate_gas() / estimate_all_functions() / estimate_with_annotations(): public API results
+- iter_all_functions(): incremental per-function results
+- result caching for repeated sources
+"""
+
+from gas_estimator import estimate_all_functions, estimate_gas, estimate_with_annotations, iter_all_functions
+
+CONTRACT = """Contract Counter(mut count: U256) {
+  @using(updateFields = true, checkExternalCaller = false)
+  pub fn increment() -> () {
+    count = count + 1
+  }
+
+  pub fn get() -> U256 {
+    return count
+  }
+}"""
+
+
+class TestEstimateAllFunctions:
+    """Tests for per-function estimation."""
+
+    def test_finds_all_functions(self):
+        results = estimate_all_functions(CONTRACT)
+        assert set(results) == {"increment", "get"}
+        assert results["increment"]["total_gas"] > 0
+        assert "## Gas Estimation for `increment`" in results["increment"]["report"]
+
+    def test_code_without_functions(self):
+        assert estimate_all_functions("Contract Empty() {}") == {}
+        assert estimate_with_annotations("Contract Empty() {}")["annotations"] == []
+
+    def test_iter_matches_estimate_all(self):
+        assert [name for name, _ in iter_all_functions(CONTRACT)] == ["increment", "get"]
+        assert dict(iter_all_functions(CONTRACT)) == estimate_all_functions(CONTRACT)
+
+
+class TestEstimateCache:
+    """Tests for caching of estimation results."""
+
+    def test_repeated_calls_return_equal_results(self):
+        assert estimate_gas(CONTRACT) == estimate_gas(CONTRACT)
+        assert estimate_with_annotations(CONTRACT) == estimate_with_annotations(CONTRACT)
+
+    def test_cached_results_are_not_shared(self):
+        first = estimate_all_functions(CONTRACT)
+        first["increment"]["warnings"].append("modified by caller")
+        first.pop("get")
+
+        second = estimate_all_functions(CONTRACT)
+        assert "get" in second
+        assert "modified by caller" not in second["increment"]["warnings"]
@@ -12,6 +12,7 @@ import os
 # Import the module under test
 import sys
 import tempfile
+from collections.abc import Mapping
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -19,15 +20,17 @@ import pytest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from translate_oz import IGNORED_IMPORTS, REPLACEMENT_LIBS, replace_imports
+from translate_oz import IGNORED_IMPORTS, replace_imports
 
 
 class TestIgnoredImports:
     """Tests for IGNORED_IMPORTS constant."""
 
     def test_ignored_imports_exists(self):
-        """Test that IGNORED_IMPORTS dict is defined."""
-        assert isinstance(IGNORED_IMPORTS, dict)
+        """Test that IGNORED_IMPORTS is a read-only mapping."""
+        assert isinstance(IGNORED_IMPORTS, Mapping)
+        with pytest.raises(TypeError):
+            IGNORED_IMPORTS["@openzeppelin/contracts/utils/Context.sol"] = ""
         assert len(IGNORED_IMPORTS) > 0
 
     def test_ignored_imports_has_context(self):
@@ -49,22 +52,47 @@ class TestIgnoredImports:
 class TestReplacementLibs:
     """Tests for REPLACEMENT_LIBS constant."""
 
-    def test_replacement_libs_is_dict(self):
+    def test_replacement_libs_is_dict(self, replacement_libs):
         """Test that REPLACEMENT_LIBS is a dictionary."""
-        assert isinstance(REPLACEMENT_LIBS, dict)
+        assert isinstance(replacement_libs, dict)
 
-    def test_replacement_libs_keys_start_with_openzeppelin(self):
+    def test_replacement_libs_keys_start_with_openzeppelin(self, replacement_libs):
         """Test that all keys are valid OpenZeppelin import paths."""
-        for key in REPLACEMENT_LIBS.keys():
+        for key in replacement_libs.keys():
             assert key.startswith("@openzeppelin/")
             assert key.endswith(".sol")
 
-    def test_replacement_libs_values_are_strings(self):
+    def test_replacement_libs_values_are_strings(self, replacement_libs):
         """Test that all values are content strings."""
-        for key, value in REPLACEMENT_LIBS.items():
+        for key, value in replacement_libs.items():
             assert isinstance(value, str)
             assert len(value) > 0
 
+    def test_replacement_libs_cache(self, tmp_path, monkeypatch):
+        """Test that the on-disk cache is reused until a library file changes."""
+        import translate_oz
+
+        oz_dir = tmp_path / "openzeppelin"
+        lib = oz_dir / "contracts" / "access" / "Ownable.ral"
+        lib.parent.mkdir(parents=True)
+        lib.write_text("Abstract Contract Ownable() {}", encoding="utf-8")
+        cache = tmp_path / "openzeppelin.cache.json"
+        monkeypatch.setattr(translate_oz, "OZ_DIR", str(oz_dir))
+        monkeypatch.setattr(translate_oz, "REPLACEMENT_LIBS_CACHE", str(cache))
+
+        expected = {"@openzeppelin/contracts/access/Ownable.sol": "Abstract Contract Ownable() {}"}
+        assert translate_oz.load_replacement_libs() == expected
+        assert cache.exists()
+
+        # A fresh cache is served without touching the library files
+        cache.write_text('{"@openzeppelin/cached.sol": "cached"}', encoding="utf-8")
+        assert translate_oz.load_replacement_libs() == {"@openzeppelin/cached.sol": "cached"}
+
+        # A newer library file invalidates it
+        stale = cache.stat().st_mtime - 10
+        os.utime(cache, (stale, stale))
+        assert translate_oz.load_replacement_libs() == expected
+
 
 @pytest.mark.parametrize(
     "imports,expected_contains",
@@ -121,15 +149,35 @@ def test_replace_imports_order_preserved():
     assert context_pos < reentrancy_pos
 
 
+def test_replace_imports_shared_comment_emitted_once():
+    """Test that ignored imports with the same explanation share a single copy of it."""
+    imports = [
+        "@openzeppelin/contracts/token/ERC20/extensions/ERC20Crosschain.sol",
+        "@openzeppelin/contracts/token/ERC20/extensions/draft-ERC20Bridgeable.sol",
+    ]
+    result = replace_imports(imports)
+
+    assert result.count(IGNORED_IMPORTS[imports[0]]) == 1
+    assert "// ERC20Crosschain.sol is omitted\n// draft-ERC20Bridgeable.sol is omitted" in result
+
+
+def test_replace_imports_normalizes_relative_paths():
+    """Test that relative OpenZeppelin paths resolve to the same replacement as absolute ones."""
+    absolute = "@openzeppelin/contracts/utils/Context.sol"
+    assert replace_imports(["../node_modules/@openzeppelin/contracts/utils/Context.sol"]) == replace_imports([absolute])
+    # Paths only mentioning openzeppelin without a directory are left as they are
+    assert replace_imports(["./openzeppelin.sol"]) == "// ./openzeppelin.sol is not available"
+
+
 class TestReplaceImportsWithLoadedLibs:
     """Tests for replace_imports when REPLACEMENT_LIBS has content."""
 
-    def test_replace_imports_uses_loaded_libs(self):
+    def test_replace_imports_uses_loaded_libs(self, replacement_libs):
         """Test that loaded library content is used when available."""
         # Only test if we have loaded libs
-        if len(REPLACEMENT_LIBS) > 0:
-            first_lib_path = list(REPLACEMENT_LIBS.keys())[0]
-            first_lib_content = REPLACEMENT_LIBS[first_lib_path]
+        if replacement_libs:
+            first_lib_path = next(iter(replacement_libs))
+            first_lib_content = replacement_libs[first_lib_path]
 
             result = replace_imports([first_lib_path])
 
@@ -172,20 +220,21 @@ class TestAgenticImports:
     """Tests for the new agentic system overhauled imports."""
 
     def test_pretranslated_libs_format(self):
-        """Test that PRETRANSLATED_LIBS has lowercase keys."""
-        from translate_oz import PRETRANSLATED_LIBS
-        for key in PRETRANSLATED_LIBS.keys():
+        """Test that get_pretranslated_libs() has lowercase keys."""
+        from translate_oz import get_pretranslated_libs
+        pretranslated_libs = get_pretranslated_libs()
+        for key in pretranslated_libs.keys():
             assert key == key.lower()
-            assert isinstance(PRETRANSLATED_LIBS[key], str)
+            assert isinstance(pretranslated_libs[key], str)
 
     def test_get_pretranslated_code_known(self):
         """Test get_pretranslated_code with a known class."""
         from translate_oz import get_pretranslated_code
         # 'ownable' or 'accesscontrol' are likely candidates if loaded
         # Let's try to find one that is actually there
-        from translate_oz import PRETRANSLATED_LIBS
-        if PRETRANSLATED_LIBS:
-            sample_key = list(PRETRANSLATED_LIBS.keys())[0]
+        from translate_oz import get_pretranslated_libs
+        if get_pretranslated_libs():
+            sample_key = next(iter(get_pretranslated_libs()))
             result = get_pretranslated_code(sample_key)
             assert result is not None
             code, specs = result
@@ -0,0 +1,193 @@
+"""
+Unit tests for translation_service.py
+
+Tests cover:
+- perform_translation(): response cache hits and the no_cache bypass
+- closing of the streamed LLM response
+- _coalesce(): merging of deltas, source errors and closing of the source when the consumer stops early
+- perform_translation_batch(): per-request failures and cancellation
+- translation_max_tokens(): output token budget bounds
+"""
+
+import asyncio
+import itertools
+import os
+from collections import OrderedDict
+from contextlib import aclosing
+from types import SimpleNamespace
+
+import pytest
+
+# translation_service refuses to import without an LLM configuration
+os.environ.setdefault("API_KEY", "test-key")
+os.environ.setdefault("LLM_MODEL", "test/model")
+os.environ.setdefault("SMART_LLM_MODEL", "test/smart-model")
+
+import translation_service
+from api_types import TranslateRequest, TranslateResponse, TranslationOptions
+
+
+class FakeStream:
+    """Streamed Responses API response yielding the given text deltas."""
+
+    def __init__(self, deltas):
+        self.events = [SimpleNamespace(type="response.output_text.delta", delta=delta) for delta in deltas]
+        self.closed = False
+
+    async def __aiter__(self):
+        for event in self.events:
+            yield event
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    """LLM client recording its requests, every response streams `deltas`."""
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.requests = []
+        self.streams = []
+        self.responses = SimpleNamespace(create=self.create)
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        self.streams.append(FakeStream(self.deltas))
+        return self.streams[-1]
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = FakeClient(["Contract ", "A() {}"])
+    monkeypatch.setattr(translation_service, "_CLIENT_CYCLE", itertools.repeat(client))
+    monkeypatch.setattr(translation_service, "_TRANSLATION_CACHE", OrderedDict())
+    return client
+
+
+def make_request(**kwargs) -> TranslateRequest:
+    options = TranslationOptions(optimize=False, include_comments=True, mimic_defaults=False)
+    return TranslateRequest(source_code="contract A {}", options=options, **kwargs)
+
+
+async def translate(request: TranslateRequest) -> str:
+    return "".join([chunk async for chunk, _, _, _ in translation_service.perform_translation(request, stream=True)])
+
+
+class TestTranslationCache:
+    """Tests for the translation response cache."""
+
+    async def test_repeated_request_is_served_from_cache(self, fake_client):
+        assert await translate(make_request()) == "Contract A() {}"
+        assert await translate(make_request()) == "Contract A() {}"
+        assert len(fake_client.requests) == 1
+
+    async def test_no_cache_request_reaches_llm(self, fake_client):
+        await translate(make_request())
+        fake_client.deltas = ["Contract B() {}"]
+
+        assert await translate(make_request(no_cache=True)) == "Contract B() {}"
+        assert len(fake_client.requests) == 2
+        # The fresh translation replaces the cached one
+        assert await translate(make_request()) == "Contract B() {}"
+        assert len(fake_client.requests) == 2
+
+
+class TestTranslationStream:
+    """Tests for the lifetime of the streamed LLM response."""
+
+    async def test_stream_closed_when_consumer_stops_early(self, fake_client):
+        translation = translation_service.perform_translation(make_request(), stream=True)
+        await anext(translation)
+        await translation.aclose()
+
+        assert fake_client.streams[0].closed
+
+
+class TestCoalesce:
+    """Tests for merging of streamed deltas."""
+
+    @pytest.mark.parametrize("max_items", [1, 16])
+    async def test_source_closed_when_consumer_breaks(self, max_items):
+        closed = []
+
+        async def deltas():
+            try:
+                yield "Contract ", ""
+                await asyncio.sleep(0)
+                yield "A() {}", ""
+                # Never reached, the consumer stops before
+                await asyncio.sleep(60)
+            finally:
+                closed.append(True)
+
+        async with aclosing(translation_service._coalesce(deltas(), max_items=max_items, max_ms=1)) as coalesced:
+            async for content, _ in coalesced:
+                assert content
+                break
+
+        assert closed
+
+    async def test_deltas_merged_until_pause(self):
+        async def deltas():
+            yield "Contract ", ""
+            yield "A() ", "thinking"
+            # The pause exceeds max_ms, the buffered deltas are yielded before the next one arrives
+            await asyncio.sleep(0.05)
+            yield "{}", ""
+
+        coalesced = [chunk async for chunk in translation_service._coalesce(deltas(), max_items=16, max_ms=10)]
+
+        assert coalesced == [("Contract A() ", "thinking"), ("{}", "")]
+
+    async def test_source_error_propagates(self):
+        async def deltas():
+            yield "Contract ", ""
+            raise ConnectionError("stream interrupted")
+
+        with pytest.raises(ConnectionError):
+            async for _ in translation_service._coalesce(deltas(), max_items=16, max_ms=10):
+                pass
+
+
+class TestTranslationBatch:
+    """Tests for concurrent batch translation."""
+
+    async def test_failed_translation_reported_in_its_response(self, monkeypatch):
+        async def collect(translate_request):
+            if translate_request.no_cache:
+                raise RuntimeError("LLM unavailable")
+            return TranslateResponse(translated_code="Contract A() {}", reasoning="")
+
+        monkeypatch.setattr(translation_service, "_collect_translation", collect)
+        responses = await translation_service.perform_translation_batch([make_request(), make_request(no_cache=True)])
+
+        assert responses[0].translated_code == "Contract A() {}"
+        assert responses[1].errors == ["LLM unavailable"]
+
+    async def test_cancelled_translation_cancels_batch(self, monkeypatch):
+        async def collect(translate_request):
+            raise asyncio.CancelledError
+
+        monkeypatch.setattr(translation_service, "_collect_translation", collect)
+        with pytest.raises(asyncio.CancelledError):
+            await translation_service.perform_translation_batch([make_request()])
+
+
+class TestTranslationMaxTokens:
+    """Tests for the output token budget."""
+
+    def test_smart_budget_is_fixed(self):
+        assert translation_service.translation_max_tokens("contract A {}", smart=True) == 25000
+        assert translation_service.translation_max_tokens("x" * 300000, smart=True) == 25000
+
+    def test_budget_scales_with_source_length(self):
+        assert translation_service.translation_max_tokens("contract A {}", smart=False) == 8000
+        assert translation_service.translation_max_tokens("x" * 15000, smart=False) == 20000
+        assert translation_service.translation_max_tokens("x" * 300000, smart=False) == 40000
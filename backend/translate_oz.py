@@ -1,13 +1,18 @@
 import logging
 import os
 import json
+from functools import cache
+from types import MappingProxyType
+from typing import Iterator, Mapping
 
 OZ_DIR = os.path.join(os.path.dirname(__file__), "openzeppelin")
+# Snapshot of load_replacement_libs() output, rebuilt whenever anything under OZ_DIR is newer
+REPLACEMENT_LIBS_CACHE = OZ_DIR + ".cache.json"
 
 logger = logging.getLogger(__name__)
 
-# Dict of OpenZeppelin imports to be ignored during translation, mapped to their replacement comments.
-IGNORED_IMPORTS: dict[str, str] = {
+# Read-only mapping of OpenZeppelin imports to be ignored during translation, mapped to their replacement comments.
+IGNORED_IMPORTS: Mapping[str, str] = MappingProxyType({
     "@openzeppelin/contracts/utils/Context.sol": "// @@@ Ralph uses built-in functions to fetch transaction data.",
     "@openzeppelin/contracts/utils/Multicall.sol": "// @@@ Ralph deals with multiple calls via TX Scripts and chained calls.",
     "@openzeppelin/contracts/utils/ReentrancyGuard.sol": "// @@@ Alephium VM blocks reentrancy on protocol level.",
@@ -39,7 +44,32 @@ IGNORED_IMPORTS: dict[str, str] = {
     "@openzeppelin/contracts/token/ERC721/extensions/ERC721URIStorage.sol": "// @@@ Ralph's NFT sub-contracts store tokenUri directly. This is supported out of the box via NFTCollectionBase and INFT.getTokenUri().",
     "@openzeppelin/contracts/token/ERC721/utils/ERC721Holder.sol": "// @@@ Ralph contracts receive tokens explicitly via functions with assetsInContract annotation, not receiver callbacks.",
     "@openzeppelin/contracts/token/ERC721/utils/ERC721Utils.sol": "// @@@ Ralph's native token model doesn't use receiver callbacks. Transfers are atomic UTXO operations.",
-}
+})
+
+
+def _newest_mtime(directory: str) -> float:
+    """Return the newest mtime of `directory`, its subdirectories and the `.ral` files in them.
+
+    Directory mtimes are included so that removed or renamed files also invalidate the cache.
+    """
+    newest = os.stat(directory).st_mtime
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                newest = max(newest, _newest_mtime(entry.path))
+            elif entry.name.endswith(".ral"):
+                newest = max(newest, entry.stat().st_mtime)
+    return newest
+
+
+def _iter_ral_files(directory: str) -> Iterator[os.DirEntry]:
+    """Yield the directory entry of every `.ral` file under `directory`."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_ral_files(entry.path)
+            elif entry.name.endswith(".ral"):
+                yield entry
 
 
 def load_replacement_libs() -> dict[str, str]:
@@ -48,94 +78,133 @@ def load_replacement_libs() -> dict[str, str]:
     Each file corresponds 1:1 to its solidity import path,
     ex. import '@openzeppelin/contracts/utils/Ownable.sol' is located under `documentation/openzeppelin/contracts/utils/Ownable.ral`
     Here we load all translated files to a dict so they are readily accessible.
+    The result is cached in `REPLACEMENT_LIBS_CACHE` and only re-read from the tree when a file changes.
     """
-    replacement_libs: dict[str, str] = {}
+    newest = _newest_mtime(OZ_DIR)
+    try:
+        if os.path.getmtime(REPLACEMENT_LIBS_CACHE) >= newest:
+            with open(REPLACEMENT_LIBS_CACHE, "r", encoding="utf-8") as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    replacement_libs = _read_replacement_libs()
+    try:
+        with open(REPLACEMENT_LIBS_CACHE, "w", encoding="utf-8") as f:
+            json.dump(replacement_libs, f)
+    except OSError as e:
+        logger.warning(f"Could not write replacement libs cache {REPLACEMENT_LIBS_CACHE}: {e}")
+    return replacement_libs
 
-    for root, _, files in os.walk(OZ_DIR):
-        for file in files:
-            if file.endswith(".ral"):
-                file_path = os.path.join(root, file)
-                import_path = file_path.replace(OZ_DIR + os.sep, "").replace(os.sep, "/").replace(".ral", ".sol")
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        content = f.read()
-                        replacement_libs[f"@openzeppelin/{import_path}"] = content
-                except Exception as e:
-                    logger.error(f"Error loading replacement lib {import_path}: {e}")
-                    raise RuntimeError("Failed to load replacement libraries") from e
 
-    return replacement_libs
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _read_replacement_libs() -> dict[str, str]:
+    """Read every `.ral` file under `OZ_DIR` into a dict keyed by its solidity import path.
+
+    The dict is ordered by path.
+    """
+    paths = sorted(entry.path for entry in _iter_ral_files(OZ_DIR))
+    try:
+        contents = [_read_text(path) for path in paths]
+    except Exception as e:
+        logger.error(f"Error loading replacement libs: {e}")
+        raise RuntimeError("Failed to load replacement libraries") from e
+
+    # Strip the `OZ_DIR/` prefix and `.ral` suffix by slicing, separators only need rewriting off POSIX
+    prefix_len = len(OZ_DIR) + 1
+    rel_paths = [path[prefix_len:-4] for path in paths]
+    if os.sep != "/":
+        rel_paths = [rel.replace(os.sep, "/") for rel in rel_paths]
+    return {f"@openzeppelin/{rel}.sol": content for rel, content in zip(rel_paths, contents)}
 
 
 REPLACEMENT_LIBS: dict[str, str] = load_replacement_libs()
-print(f"Loaded {len(REPLACEMENT_LIBS)} OpenZeppelin replacement libraries.")
+logger.info(f"Loaded {len(REPLACEMENT_LIBS)} OpenZeppelin replacement libraries.")
+
+# "// [name.sol] is omitted" line of every ignored import
+_OMITTED_LINE: dict[str, str] = {path: f"// {path.rpartition('/')[2]} is omitted" for path in IGNORED_IMPORTS}
+
+# Maps an import path to its related interface library, ex. `.../Ownable.sol` -> `.../IOwnable.sol`,
+# for every interface present in REPLACEMENT_LIBS. Paths already naming an interface are not keys.
+_INTERFACE_OF: dict[str, str] = {
+    f"{directory}/{name[1:]}": path
+    for path in REPLACEMENT_LIBS
+    for directory, _, name in [path.rpartition("/")]
+    if name.startswith("I") and not name[1:].startswith("I")
+}
 
 
 def replace_imports(imports: list[str]) -> str:
     """Given a list of solidity import paths, return the concatenated replacement text for those imports.
 
-    If an import is in IGNORED_IMPORTS, its comment replacement is used.
+    If an import is in IGNORED_IMPORTS, its comment replacement is used, imports sharing a comment are listed under one copy of it.
     If an import is in REPLACEMENT_LIBS, its loaded content is used.
     Otherwise, "// [IMPORT_PATH] is not available" is used
     """
-    # dict to deduplicate imports and cover special cases
+    # dicts to deduplicate imports and cover special cases, interfaces are appended after all imports
+    seen: set[str] = set()
     replacements: dict[str, str] = {}
-    
+    omitted: dict[str, list[str]] = {}
+    interfaces: dict[str, None] = {}
+
     for imp in imports:
         # Normalize relative imports to absolute paths
-        if ("openzeppelin" in imp) and not imp.startswith("@openzeppelin"):
-            imp = "@openzeppelin/" + imp.split("openzeppelin/")[1]
+        if not imp.startswith("@openzeppelin"):
+            if tail := imp.partition("openzeppelin/")[2]:
+                imp = "@openzeppelin/" + tail
+
+        if imp in seen:
+            continue
+        seen.add(imp)
 
         # If the path is ignored we will provide a short information in this format:
         #   // @@@ Ralph handles X in a different manner than solidity
         #   // [name.sol] is omitted
-        if ignored := IGNORED_IMPORTS.get(imp):
-            sol_name = imp.split("/")[-1]
-            ignored += f"\n// {sol_name} is omitted"
-            replacements[imp] = ignored
-        elif replacementLib := REPLACEMENT_LIBS.get(imp):
-            replacements[imp] = replacementLib
+        #   // [other.sol] is omitted
+        if comment := IGNORED_IMPORTS.get(imp):
+            if comment not in omitted:
+                omitted[comment] = [comment]
+                replacements[comment] = ""  # reserves the position of the first import sharing the comment
+            omitted[comment].append(_OMITTED_LINE[imp])
         else:
-            replacements[imp] = f"// {imp} is not available"
+            replacements[imp] = REPLACEMENT_LIBS.get(imp) or f"// {imp} is not available"
+        if interface_lib := _INTERFACE_OF.get(imp):
+            interfaces.setdefault(interface_lib)
 
-    def find_interface_lib(lib_path: str) -> None | str:
-        """Return path to a related interface library. (The path may not exist)"""
-        src = lib_path.split("/")
-        if src[-1].startswith("I"):
-            return None # already an interface
-        return "/".join(src[:-1] + ["I" + src[-1]])
+    for comment, lines in omitted.items():
+        replacements[comment] = "\n".join(lines)
 
-    for key in list(replacements.keys()):
-        interface_lib = find_interface_lib(key)
-        if interface_lib and interface_lib not in replacements:
-            if interface_content := REPLACEMENT_LIBS.get(interface_lib):
-                replacements[interface_lib] = interface_content
+    for interface_lib in interfaces:
+        if interface_lib not in seen and (interface_content := REPLACEMENT_LIBS[interface_lib]):
+            replacements[interface_lib] = interface_content
 
     return "\n\n".join(replacements.values())
 
 ### Agentic system overhauled imports
 
+@cache
 def get_pretranslated_libs() -> dict[str, str]:
     """Return a dict of available OpenZeppelin imports and generic class names and their replacement text for agentic model.
     
     The keys are simply class names in lowercase (ex. 'ownable') and the values are the replacement text or ignore text.
+    Built on first use and shared afterwards, callers must not modify it.
     """
     res: dict[str, str] = {}
 
     for lib, explanation in IGNORED_IMPORTS.items():
-        class_name = lib.split("/")[-1].replace(".sol", "")
-        comment = f"// {class_name} is not needed in Ralph."
-        res[class_name.lower()] = explanation + "\n" + comment
+        class_name = lib.rpartition("/")[2][:-4]
+        res[class_name.lower()] = f"{explanation}\n// {class_name} is not needed in Ralph."
 
     for lib, content in REPLACEMENT_LIBS.items():
-        class_name = lib.split("/")[-1].replace(".sol", "")
+        class_name = lib.rpartition("/")[2][:-4]
         res[class_name.lower()] = content
 
     return res
 
-# Preload the pretranslated libs for use in agent_service (keys are class/interface names in lowercase)
-PRETRANSLATED_LIBS = get_pretranslated_libs()
-
 
 def load_replacement_jsons() -> dict[str, list]:
     """Load replacement JSON specs from files present under `documentation/openzeppelin`"""
@@ -145,7 +214,7 @@ def load_replacement_jsons() -> dict[str, list]:
         for file in files:
             if file.endswith(".ral.json"):
                 file_path = os.path.join(root, file)
-                # We use the file name stem (lowercase) as key to match PRETRANSLATED_LIBS
+                # We use the file name stem (lowercase) as key to match get_pretranslated_libs()
                 file_stem = file.replace(".ral.json", "").lower()
                 try:
                     with open(file_path, "r", encoding="utf-8") as f:
@@ -164,7 +233,7 @@ PRETRANSLATED_LIBS_JSONS = load_replacement_jsons()
 def get_pretranslated_code(class_name: str) -> None | tuple[str, list]:
     """Given a class or interface name, return its pretranslated code and json schema if available."""
     key = class_name.lower()
-    code = PRETRANSLATED_LIBS.get(key)
+    code = get_pretranslated_libs().get(key)
     specs = PRETRANSLATED_LIBS_JSONS.get(key, [])
     
     if code:
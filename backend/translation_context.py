@@ -1,5 +1,6 @@
 import logging
 import os
+from functools import cache
 
 TRANSLATIONS_DIR = os.path.join(os.path.dirname(__file__), "translations")
 DOCS_DIR = os.path.join(os.path.dirname(__file__), "documentation")
@@ -15,7 +16,13 @@ def load_ralph_details() -> str:
     if not os.path.exists(DOCS_DIR):
         return "Ralph language details not found. Please ensure documentation directory exists."
 
-    markdown_content = []
+    # Headers and file contents are kept as separate parts and joined once, so each file is copied only once
+    markdown_content: list[str] = []
+
+    def add_file(filename: str, content: str) -> None:
+        separator = "\n\n" if markdown_content else ""
+        markdown_content.append(f"{separator}--- {filename} ---\n")
+        markdown_content.append(content)
 
     # Define priority order for documentation files
     priority_files = ["types.md", "operators.md", "functions.md", "contracts.md", "built-in-functions.md"]
@@ -24,12 +31,13 @@ def load_ralph_details() -> str:
         # First add priority files in specified order
         for filename in priority_files:
             file_path = os.path.join(DOCS_DIR, filename)
-            if os.path.exists(file_path):
+            try:
                 with open(file_path, "r", encoding="utf-8") as f:
                     content = f.read()
-                    markdown_content.append(f"--- {filename} ---\n{content}")
-            else:
+            except FileNotFoundError:
                 logger.warning(f"{filename} not found in documentation directory.")
+                continue
+            add_file(filename, content)
 
         # Then add any remaining markdown files
         extras = []
@@ -38,15 +46,14 @@ def load_ralph_details() -> str:
                 file_path = os.path.join(DOCS_DIR, filename)
                 extras.append(filename)
                 with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    markdown_content.append(f"--- {filename} ---\n{content}")
+                    add_file(filename, f.read())
         if extras:
             logger.info(f"Additional documentation files loaded: {', '.join(extras)}")
 
         if not markdown_content:
             return "No markdown files found in documentation directory."
 
-        return "\n\n".join(markdown_content)
+        return "".join(markdown_content)
     except Exception as e:
         logger.error(f"Error loading documentation: {e}")
         raise RuntimeError("Failed to load Ralph details") from e
@@ -69,28 +76,35 @@ def load_example_translations() -> str:
         in_path = os.path.join(TRANSLATIONS_DIR, f"in{i}.sol")
         out_path = os.path.join(TRANSLATIONS_DIR, f"out{i}.ral")
 
-        if not (os.path.exists(in_path) and os.path.exists(out_path)):
-            break
-
+        # The first missing pair ends the sequence, opening directly avoids a separate existence check
         try:
             with open(in_path, "r", encoding="utf-8") as f_in, open(out_path, "r", encoding="utf-8") as f_out:
                 input_content = f_in.read()
                 output_content = f_out.read()
-
-                # Add to concat parts with clear separators
-                concat_parts.append(f"--- Example {i} Input (in{i}.sol) ---\n{input_content}")
-                concat_parts.append(f"--- Example {i} Output (out{i}.ral) ---\n{output_content}")
-
-            i += 1
+        except FileNotFoundError:
+            break
         except Exception as e:
             logger.error(f"Error loading example translation pair {i}: {e}")
             raise RuntimeError("Failed to load example translations") from e
 
+        # Add to concat parts with clear separators
+        concat_parts.append(f"--- Example {i} Input (in{i}.sol) ---\n{input_content}")
+        concat_parts.append(f"--- Example {i} Output (out{i}.ral) ---\n{output_content}")
+        i += 1
+
     if not concat_parts:
         return "No example translations found."
 
     return "\n\n".join(concat_parts)
 
 
-RALPH_DETAILS = load_ralph_details()
-EXAMPLE_TRANSLATIONS = load_example_translations()
+@cache
+def get_ralph_details() -> str:
+    """Return the Ralph documentation, loaded from disk on first use."""
+    return load_ralph_details()
+
+
+@cache
+def get_example_translations() -> str:
+    """Return the example translations, loaded from disk on first use."""
+    return load_example_translations()
@@ -1,29 +1,87 @@
+import asyncio
+import contextlib
+import hashlib
+import itertools
 import logging
 import os
+import queue
+import sys
 import time
-from typing import AsyncGenerator
+from collections import OrderedDict
+from functools import cache, lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from typing import AsyncGenerator, AsyncIterator
 
+import httpx
 import openai
-from dotenv import load_dotenv
+import orjson
 
-from api_types import TranslateRequest
+from api_types import TranslateRequest, TranslateResponse
+from settings import SETTINGS
 from templates import LOG_TEMPLATE, UPGRADE_TEMPLATE, get_user_prompt
-from translation_context import EXAMPLE_TRANSLATIONS, RALPH_DETAILS
+from translation_context import get_ralph_details
 
-load_dotenv()
-
-API_KEY = os.getenv("API_KEY")
-API_URL = os.getenv("API_URL", "https://openrouter.ai/api/v1")
-LLM_MODEL = os.getenv("LLM_MODEL")
-SMART_LLM_MODEL = os.getenv("SMART_LLM_MODEL")
+API_KEY = SETTINGS.api_key
+API_URL = SETTINGS.api_url
+LLM_MODEL = SETTINGS.llm_model
+SMART_LLM_MODEL = SETTINGS.smart_llm_model
 TRANSLATIONS_DIR = os.path.join(os.path.dirname(__file__), "translations")
 DOCS_DIR = os.path.join(os.path.dirname(__file__), "documentation")
 DUMP_DIR = os.path.join(os.path.dirname(__file__), "dumps")
 MAX_DUMP_LENGTH = 100000
+DUMP_QUEUE_SIZE = 1024
+# Pre-translated imports are passed inside the source code between these markers
+IMPORTS_START_MARKER = "/* IMPORTS_START */\n"
+IMPORTS_END_MARKER = "/* IMPORTS_END */"
+LLM_MAX_CONCURRENCY = SETTINGS.llm_max_concurrency
+STREAM_BATCH_SIZE = SETTINGS.stream_batch_size
+STREAM_MAX_MS = SETTINGS.stream_max_ms
+TRANSLATION_CACHE_SIZE = SETTINGS.translation_cache_size
+TRANSLATION_BATCH_MAX = SETTINGS.translation_batch_max
 
 if API_KEY is None or API_URL is None or LLM_MODEL is None or SMART_LLM_MODEL is None:
     raise RuntimeError("API_KEY, API_URL, LLM_MODEL and SMART_LLM_MODEL must be set in the environment variables.")
 
+# Request logs only enqueue records on the event loop, the listener thread formats and writes them to stdout
+logger = logging.getLogger("translation")
+logger.setLevel(getattr(logging, SETTINGS.log_level.upper()))
+logger.propagate = False
+_LOG_QUEUE: queue.SimpleQueue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(_LOG_QUEUE))
+_LOG_LISTENER = QueueListener(_LOG_QUEUE, logging.StreamHandler(sys.stdout))
+_LOG_LISTENER.start()
+
+# Sampling temperature of each configured model, gemini models are run at their default of 1.0
+_MODEL_TEMP = {model: 1.0 if "gemini" in model else 0.2 for model in (LLM_MODEL, SMART_LLM_MODEL)}
+# Output token budget of a translation between these bounds, keyed by the smart option.
+# Reasoning tokens of the smart model count towards it and do not scale with the source, so its budget stays fixed.
+_TRANSLATION_MIN_TOKENS = {True: 25000, False: 8000}
+_TRANSLATION_MAX_TOKENS = {True: 25000, False: 40000}
+FIM_MAX_TOKENS = 20000
+
+# Shared across requests so pooled keep-alive connections to the LLM backend are reused.
+# Streams can last minutes, the read timeout covers the whole response. The pool size is set from the environment.
+# HTTP/2 multiplexes concurrent streams over one connection when the backend negotiates it, HTTP/1.1 is used otherwise.
+_HTTP_CLIENT = openai.DefaultAsyncHttpxClient(
+    limits=httpx.Limits(
+        max_connections=SETTINGS.llm_max_connections, max_keepalive_connections=SETTINGS.llm_max_keepalive
+    ),
+    timeout=httpx.Timeout(600.0, connect=10.0),
+    http2=True,
+)
+# One client per configured endpoint, all sharing the connection pool, requests take them in turn
+_CLIENTS = [
+    openai.AsyncOpenAI(
+        api_key=api_key, base_url=base_url, http_client=_HTTP_CLIENT, max_retries=SETTINGS.llm_max_retries
+    )
+    for base_url, api_key in SETTINGS.llm_endpoints
+]
+_CLIENT_CYCLE = itertools.cycle(_CLIENTS)
+# Warm-up requests give up quickly, a slow or unreachable endpoint is left to the first real request
+WARM_UP_TIMEOUT = 5.0
+# Held for the whole lifetime of a streamed response, not just while the request is sent
+_LLM_SEMAPHORE = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
 def build_translation_system_prompt() -> str:
     """
     Builds the system prompt for translation based on provided options.
@@ -61,9 +119,9 @@ def build_translation_system_prompt() -> str:
         "Just the translated Ralph code with minimal, relevant comments.\n"
         "The code should be ready to use without requiring the user to understand the translation process.\n\n"
         "Ralph Language Details:\n"
-        f"{RALPH_DETAILS}\n\n"
+        f"{get_ralph_details()}\n\n"
         # "Example Translations:\n"
-        # f"{EXAMPLE_TRANSLATIONS}"
+        # f"{get_example_translations()}"
     )
     
     return base_prompt
@@ -91,12 +149,203 @@ def build_fim_system_prompt() -> str:
         "9. Every translated function can include an additional comment explaining the differences in behavior between Solidity and Ralph, if present. These comments must be one line long and start with '// @@@'.\n"
         "   Example: // @@@ Solidity allows dynamic array parameters, but Ralph only supports fixed-size arrays.\n\n"
         "10. Use curly braces syntax when calling functions (even when calling own functions) defined with preapprovedAssets annotation\n\n"
-        f"Ralph Language Details:\n\n{RALPH_DETAILS}"
+        f"Ralph Language Details:\n\n{get_ralph_details()}"
     )
 
 
-# Keep original SYSTEM_PROMPT for backwards compatibility
+# The system prompt does not depend on the request, so it is built once per process
 SYSTEM_PROMPT = build_translation_system_prompt()
+FIM_SYSTEM_PROMPT = build_fim_system_prompt()
+
+# Stable per-prompt keys, let providers that support prompt caching route requests sharing the system prompt together
+SYSTEM_PROMPT_CACHE_KEY = hashlib.sha256(SYSTEM_PROMPT.encode()).hexdigest()[:16]
+FIM_SYSTEM_PROMPT_CACHE_KEY = hashlib.sha256(FIM_SYSTEM_PROMPT.encode()).hexdigest()[:16]
+
+
+@cache
+def system_input_message(system_prompt: str, model: str) -> dict:
+    """
+    Returns the system message in Responses API input format.
+    Anthropic models only cache prompt prefixes marked with cache_control, other providers cache automatically.
+    The message is built once per prompt and model and shared between requests, it must not be modified.
+    """
+    if "anthropic" in model or "claude" in model:
+        content = [{"type": "input_text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+        return {"type": "message", "role": "system", "content": content}
+    return {"type": "message", "role": "system", "content": system_prompt}
+
+
+# Completed translations as (content, reasoning), keyed by translation_cache_key() and ordered by last use
+_TRANSLATION_CACHE: OrderedDict[str, tuple[str, str]] = OrderedDict()
+
+
+def translation_cache_key(model: str, translate_request: TranslateRequest) -> str:
+    """
+    Returns the response cache key of a translation request.
+    The source is normalized so requests differing only in trailing whitespace or line endings share a key.
+    Upgrades of a previous translation are keyed by its code and errors as well, both are part of the prompt.
+    """
+    source = "\n".join(line.rstrip() for line in translate_request.source_code.splitlines()).strip()
+    parts = [model, translate_request.options.model_dump_json(), source]
+    previous = translate_request.previous_translation
+    if previous:
+        parts.append(previous.source_code)
+        parts.extend(previous.errors)
+    data = "\0".join(parts)
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def _get_cached_translation(key: str) -> tuple[str, str] | None:
+    cached = _TRANSLATION_CACHE.get(key)
+    if cached is not None:
+        _TRANSLATION_CACHE.move_to_end(key)
+    return cached
+
+
+def _cache_translation(key: str, content: str, reasoning: str) -> None:
+    _TRANSLATION_CACHE[key] = (content, reasoning)
+    _TRANSLATION_CACHE.move_to_end(key)
+    while len(_TRANSLATION_CACHE) > TRANSLATION_CACHE_SIZE:
+        _TRANSLATION_CACHE.popitem(last=False)
+
+
+async def warm_up_client() -> None:
+    """
+    Opens a connection to each configured LLM endpoint ahead of the first translation.
+    Meant to run as a background task on application startup, failures are only logged and requests connect on demand.
+    """
+    # Connections are per host, endpoints sharing a base URL only differ in their key
+    clients = {str(client.base_url): client for client in _CLIENTS}
+    results = await asyncio.gather(
+        *(client.with_options(max_retries=0, timeout=WARM_UP_TIMEOUT).models.list() for client in clients.values()),
+        return_exceptions=True,
+    )
+    for base_url, result in zip(clients, results):
+        if isinstance(result, Exception):
+            logger.warning(f"LLM client warm-up of {base_url} failed: {result!r}")
+        elif isinstance(result, BaseException):
+            raise result
+
+
+async def close_client() -> None:
+    """Closes the shared LLM connection pool, call on application shutdown."""
+    await _HTTP_CLIENT.aclose()
+
+
+def stop_logging() -> None:
+    """Writes out queued log records and stops the log listener thread, call on application shutdown."""
+    _LOG_LISTENER.stop()
+
+
+async def _stream_deltas(response: AsyncIterator) -> AsyncGenerator[tuple[str, str], None]:
+    """Yields (content, reasoning) text deltas of a streamed Responses API response, empty deltas are skipped."""
+    async for event in response:
+        event_type = event.type
+        if event_type == "response.output_text.delta":
+            if delta := event.delta:
+                yield delta, ""
+        elif event_type == "response.reasoning_text.delta":
+            if delta := event.delta:
+                yield "", delta
+
+
+# Ends the queue of merged deltas in _coalesce()
+_END_OF_STREAM = object()
+
+
+async def _coalesce(
+    deltas: AsyncGenerator[tuple[str, str], None],
+    max_items: int = STREAM_BATCH_SIZE,
+    max_ms: int = STREAM_MAX_MS,
+) -> AsyncGenerator[tuple[str, str], None]:
+    """
+    Merges (content, reasoning) deltas, yielding once max_items deltas are buffered or max_ms has passed
+    since the first buffered one. The time bound also applies while waiting for the next delta.
+    """
+    max_s = max_ms / 1000
+    loop = asyncio.get_running_loop()
+    # Merged deltas, followed by _END_OF_STREAM or the exception that ended the source
+    queue: asyncio.Queue = asyncio.Queue()
+    content_parts: list[str] = []
+    reasoning_parts: list[str] = []
+    count = 0
+    deadline = 0.0
+    timer = None
+
+    def flush() -> None:
+        nonlocal count, timer
+        if timer is not None:
+            timer.cancel()
+            timer = None
+        queue.put_nowait(("".join(content_parts), "".join(reasoning_parts)))
+        content_parts.clear()
+        reasoning_parts.clear()
+        count = 0
+
+    async def pump() -> None:
+        # Iterates the source directly, one timer per merged chunk flushes it when the source pauses
+        nonlocal count, deadline, timer
+        try:
+            async for content, reasoning in deltas:
+                if content:
+                    content_parts.append(content)
+                if reasoning:
+                    reasoning_parts.append(reasoning)
+                count += 1
+                if count == 1:
+                    deadline = time.monotonic() + max_s
+                    timer = loop.call_later(max_s, flush)
+                if count >= max_items or time.monotonic() >= deadline:
+                    flush()
+            if count:
+                flush()
+        except BaseException as e:
+            queue.put_nowait(e)
+            if not isinstance(e, Exception):
+                raise
+        else:
+            queue.put_nowait(_END_OF_STREAM)
+
+    # The consumer only wakes up once per merged chunk, not once per delta
+    pump_task = asyncio.ensure_future(pump())
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END_OF_STREAM:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        if timer is not None:
+            timer.cancel()
+        pump_task.cancel()
+        # The source can only be closed once the pump has stopped iterating it
+        await asyncio.wait((pump_task,))
+        await deltas.aclose()
+
+
+@lru_cache(maxsize=64)
+def _request_log_line(
+    optimize: bool, include_comments: bool, mimic_defaults: bool, translate_erc20: bool, model: str
+) -> str:
+    """Formats the request log line, there are only a few distinct option combinations so each is formatted once."""
+    return LOG_TEMPLATE.format(
+        optimize=optimize,
+        include_comments=include_comments,
+        mimic_defaults=mimic_defaults,
+        translate_erc20=translate_erc20,
+        llm_model=model,
+        api_url=API_URL,
+    )
+
+
+def translation_max_tokens(code: str, smart: bool) -> int:
+    """
+    Returns the output token budget of translating `code`, scaled from its length instead of always the maximum.
+    Source code is estimated at 3 characters per token and the Ralph output at up to 4 times its token count.
+    """
+    return min(_TRANSLATION_MAX_TOKENS[smart], max(_TRANSLATION_MIN_TOKENS[smart], len(code) // 3 * 4))
 
 
 def preprocess_source_code(source_code: str) -> str:
@@ -123,8 +372,6 @@ async def perform_fim_translation(
     # We use the smart model for coding tasks usually
     model = SMART_LLM_MODEL if smart else LLM_MODEL
 
-    system_prompt = build_fim_system_prompt()
-    
     user_prompt = (
         "Here is the context for the translation:\n\n"
         "=== ORIGINAL SOLIDITY CODE ===\n"
@@ -134,47 +381,28 @@ async def perform_fim_translation(
         "Please generate the code to fill the <|fim_start|> ... <|fim_end|> block."
     )
 
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_prompt}
+    # Responses API input, the immutable system prompt always leads so it can be served from the prompt cache
+    input_messages = [
+        system_input_message(FIM_SYSTEM_PROMPT, model),
+        {"type": "message", "role": "user", "content": user_prompt},
     ]
 
-    # Convert to API format
-    input_messages = []
-    for msg in messages:
-        input_messages.append({
-            "type": "message",
-            "role": msg["role"],
-            "content": msg["content"]
-        })
-
     try:
-        async with openai.AsyncOpenAI(
-            api_key=API_KEY, 
-            base_url=API_URL.replace("/chat/completions", "")
-        ) as client:
-            temp = 1.0 if "gemini" in model else 0.2
-            
-            response = await client.responses.create(
+        async with _LLM_SEMAPHORE:
+            response = await next(_CLIENT_CYCLE).responses.create(
                 model=model,
                 input=input_messages,
-                max_output_tokens=20000,
-                temperature=temp,
-                stream=True
+                max_output_tokens=FIM_MAX_TOKENS,
+                temperature=_MODEL_TEMP[model],
+                stream=True,
+                extra_body={"prompt_cache_key": FIM_SYSTEM_PROMPT_CACHE_KEY},
             )
-            
-            async for event in response:
-                content = ""
-                reasoning = ""
-
-                if event.type == "response.output_text.delta":
-                    content = event.delta
-                elif event.type == "response.reasoning_text.delta":
-                    reasoning = event.delta
-                
-                if content or reasoning:
+
+            # Closing the stream releases its pooled connection, also when the consumer stops early
+            async with response:
+                async for content, reasoning in _coalesce(_stream_deltas(response)):
                     yield content, reasoning, warnings, errors
-                    
+
     except Exception as e:
         # Fallback handling or re-raise
         raise RuntimeError(f"FIM Translation failed: {str(e)}") from e
@@ -189,31 +417,29 @@ async def perform_translation(
     """
     warnings: list[str] = []
     errors: list[str] = []
-    optimize = translate_request.options.optimize
-    include_comments = translate_request.options.include_comments
-    mimic_defaults = translate_request.options.mimic_defaults
-    translate_erc20 = translate_request.options.translate_erc20
+    options = translate_request.options
+    optimize = options.optimize
+    include_comments = options.include_comments
+    mimic_defaults = options.mimic_defaults
+    translate_erc20 = options.translate_erc20
+    smart = options.smart
     source_code = translate_request.source_code
     previous = translate_request.previous_translation
-    model = SMART_LLM_MODEL if translate_request.options.smart else LLM_MODEL
+    model = SMART_LLM_MODEL if smart else LLM_MODEL
 
-    # Check for import markers and split if they exist
+    # Check for import markers and split if they exist, slicing at the marker positions copies each part only once
     resolved_imports = ""
     code = source_code
-    if "/* IMPORTS_START */" in source_code and "/* IMPORTS_END */" in source_code:
-        resolved_imports, code = source_code.split("/* IMPORTS_START */\n")[1].split("/* IMPORTS_END */")
-
-    print(
-        LOG_TEMPLATE.format(
-            optimize=optimize,
-            include_comments=include_comments,
-            mimic_defaults=mimic_defaults,
-            translate_erc20=translate_erc20,
-            llm_model=model,
-            api_url=API_URL,
-        ),
-        flush=True,
-    )
+    start = source_code.find(IMPORTS_START_MARKER)
+    if start != -1:
+        start += len(IMPORTS_START_MARKER)
+        end = source_code.find(IMPORTS_END_MARKER, start)
+        if end != -1:
+            resolved_imports = source_code[start:end]
+            code = source_code[end + len(IMPORTS_END_MARKER):]
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(_request_log_line(optimize, include_comments, mimic_defaults, translate_erc20, model))
 
     user_prompt = get_user_prompt(
         optimize=optimize,
@@ -223,85 +449,202 @@ async def perform_translation(
         source_code=code,
     )
 
-    # Build system prompt with options
-    system_prompt = build_translation_system_prompt()
     imports_prompt = f"// INCLUDED PRE-TRANSLATED LIBRARIES: \n{resolved_imports}\n\n// END OF INCLUDED PRE-TRANSLATED LIBRARIES - this code is freely available in the global scope, do not duplicate it\n"
 
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "assistant", "content": imports_prompt},
-        {"role": "user", "content": user_prompt}
+    # OpenRouter Responses API input.
+    # Ordered from most to least stable (system prompt, included libraries, request) to maximize the cached prefix.
+    input_messages = [
+        system_input_message(SYSTEM_PROMPT, model),
+        {"type": "message", "role": "assistant", "content": imports_prompt},
+        {"type": "message", "role": "user", "content": user_prompt},
     ]
 
     if previous:
-        messages.append({"role": "assistant", "content": previous.source_code})
-        messages.append(
-            {"role": "user", "content": UPGRADE_TEMPLATE.format(previous_errors="\n\n".join(previous.errors))}
+        input_messages += (
+            {"type": "message", "role": "assistant", "content": previous.source_code},
+            {
+                "type": "message",
+                "role": "user",
+                "content": UPGRADE_TEMPLATE.format(previous_errors="\n\n".join(previous.errors)),
+            },
         )
 
-    # Convert messages to OpenRouter Responses API input format
-    input_messages = []
-    for msg in messages:
-        input_messages.append({
-            "type": "message",
-            "role": msg["role"],
-            "content": msg["content"]
-        })
-
     try:
-        async with openai.AsyncOpenAI(
-            api_key=API_KEY, 
-            base_url=API_URL.replace("/chat/completions", "")
-        ) as client:
-            if not stream:
-                raise RuntimeError("Non-streaming mode is not supported anymore.")
-            if resolved_imports:
-                yield resolved_imports + "\n", "", warnings, errors
-            
-            temp = 1.0 if "gemini" in model else 0.2
-
-            response = await client.responses.create(
+        if not stream:
+            raise RuntimeError("Non-streaming mode is not supported anymore.")
+
+        cache_key = translation_cache_key(model, translate_request)
+        # Sampled output can differ between attempts, no_cache requests a fresh one (which then replaces the cached one)
+        if not translate_request.no_cache and (cached := _get_cached_translation(cache_key)):
+            yield cached[0], cached[1], warnings, errors
+            return
+
+        content_parts: list[str] = []
+        reasoning_parts: list[str] = []
+        if resolved_imports:
+            content_parts.append(resolved_imports + "\n")
+            yield resolved_imports + "\n", "", warnings, errors
+
+        async with _LLM_SEMAPHORE:
+            response = await next(_CLIENT_CYCLE).responses.create(
                 model=model,
                 input=input_messages,
-                max_output_tokens=25000 if translate_request.options.smart else 40000,
-                temperature=temp,
-                stream=True
+                max_output_tokens=translation_max_tokens(code, smart),
+                temperature=_MODEL_TEMP[model],
+                stream=True,
+                extra_body={"prompt_cache_key": SYSTEM_PROMPT_CACHE_KEY},
             )
-            
-            async for event in response:
-                content = ""
-                reasoning = ""
-
-                if event.type == "response.output_text.delta":
-                    content = event.delta
-                elif event.type == "response.reasoning_text.delta":
-                    reasoning = event.delta
-                
-                if content or reasoning:
+
+            # Closing the stream releases its pooled connection, also when the consumer stops early
+            async with response:
+                async for content, reasoning in _coalesce(_stream_deltas(response)):
+                    content_parts.append(content)
+                    reasoning_parts.append(reasoning)
                     yield content, reasoning, warnings, errors
 
+        # Only fully received translations are cached, interrupted streams never reach this point
+        translated = "".join(content_parts)
+        if translated and not translated.isspace():
+            _cache_translation(cache_key, translated, "".join(reasoning_parts))
+
     except Exception as e:
         raise RuntimeError(f"OpenRouter Responses API request failed: {str(e)}") from e
 
 
+_DUMP_COUNTER = itertools.count()
+
+
+@cache
+def _ensure_dump_dir() -> None:
+    """Creates DUMP_DIR on the first dump, later dumps skip the check."""
+    os.makedirs(DUMP_DIR, exist_ok=True)
+
+
 def dump_translation(request: TranslateRequest, translated_code: str) -> None:
     """
     Dumps the translation details to a file.
     """
     sep = "-" * 10  # section separator
-    content = (
-        f"{sep} Options: {sep}\n{request.options.model_dump_json(indent=2)}\n"
-        f"{sep} Source Code: {sep}\n{request.source_code}\n"
-        f"{sep} Translated Code: {sep}\n{translated_code}\n"
-    )
-    if len(content) > MAX_DUMP_LENGTH:
-        content = content[:MAX_DUMP_LENGTH] + "\n\n[Content truncated due to size limit]"
+    options_json = orjson.dumps(request.options.model_dump(), option=orjson.OPT_INDENT_2).decode()
+    parts = [
+        f"{sep} Options: {sep}\n", options_json, "\n",
+        f"{sep} Source Code: {sep}\n", request.source_code, "\n",
+        f"{sep} Translated Code: {sep}\n", translated_code, "\n",
+    ]
+    # Parts past MAX_DUMP_LENGTH are cut before joining, so oversized code is never copied in full
+    if sum(map(len, parts)) > MAX_DUMP_LENGTH:
+        kept = []
+        budget = MAX_DUMP_LENGTH
+        for part in parts:
+            if len(part) >= budget:
+                kept.append(part[:budget])
+                break
+            kept.append(part)
+            budget -= len(part)
+        kept.append("\n\n[Content truncated due to size limit]")
+        parts = kept
 
     try:
-        os.makedirs(DUMP_DIR, exist_ok=True)
-        nanosecond_timestamp = time.time_ns()
-        dump_file = os.path.join(DUMP_DIR, f"translation_{nanosecond_timestamp}.txt")
-        with open(dump_file, "x", encoding="utf-8") as f:
-            f.write(content)
+        _ensure_dump_dir()
+        # The counter keeps names unique when dumps land within the same clock tick
+        dump_file = f"{DUMP_DIR}{os.sep}translation_{time.time_ns()}_{next(_DUMP_COUNTER)}.txt"
+        try:
+            f = open(dump_file, "x", encoding="utf-8", newline="")
+        except FileNotFoundError:
+            # DUMP_DIR was removed while running, it is only created again here instead of being checked per dump
+            os.makedirs(DUMP_DIR, exist_ok=True)
+            f = open(dump_file, "x", encoding="utf-8", newline="")
+        # Parts are written one by one through the file buffer, the whole dump is never joined in memory
+        with f:
+            f.writelines(parts)
     except Exception as e:
-        logging.error(f"Failed to dump translation: {e}")
+        logger.error(f"Failed to dump translation: {e}")
+
+
+# Translations waiting for the dump writer task, dumps beyond DUMP_QUEUE_SIZE are dropped
+_DUMP_QUEUE: asyncio.Queue[tuple[TranslateRequest, str]] = asyncio.Queue(maxsize=DUMP_QUEUE_SIZE)
+_dump_writer: asyncio.Task | None = None
+
+
+def _write_dumps(batch: list[tuple[TranslateRequest, str]]) -> None:
+    for request, translated_code in batch:
+        dump_translation(request, translated_code)
+
+
+async def _dump_worker() -> None:
+    """
+    Writes queued dumps on a worker thread, every dump queued in the meantime is taken along in the same batch.
+    """
+    while True:
+        batch = [await _DUMP_QUEUE.get()]
+        while not _DUMP_QUEUE.empty():
+            batch.append(_DUMP_QUEUE.get_nowait())
+        try:
+            await asyncio.to_thread(_write_dumps, batch)
+        finally:
+            for _ in batch:
+                _DUMP_QUEUE.task_done()
+
+
+def start_dump_writer() -> None:
+    """Starts the background task writing queued dumps, call on application startup."""
+    global _dump_writer
+    _dump_writer = asyncio.create_task(_dump_worker())
+
+
+async def stop_dump_writer() -> None:
+    """Writes out the queued dumps and stops the writer task, call on application shutdown."""
+    if _dump_writer is None:
+        return
+    await _DUMP_QUEUE.join()
+    _dump_writer.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _dump_writer
+
+
+def queue_dump(request: TranslateRequest, translated_code: str) -> None:
+    """
+    Hands the translation to the dump writer task without waiting for it to be written.
+    """
+    try:
+        _DUMP_QUEUE.put_nowait((request, translated_code))
+    except asyncio.QueueFull:
+        logger.warning("Dump queue is full, translation dump dropped")
+
+
+async def _collect_translation(translate_request: TranslateRequest) -> TranslateResponse:
+    """
+    Runs a streamed translation to completion and dumps it, returns the joined result.
+    """
+    code_parts: list[str] = []
+    reasoning_parts: list[str] = []
+    warnings: list[str] = []
+    errors: list[str] = []
+    # The same warnings and errors lists are yielded with every chunk, the last ones are complete
+    async for chunk, reasoning, warnings, errors in perform_translation(translate_request, stream=True):
+        code_parts.append(chunk)
+        reasoning_parts.append(reasoning)
+    translated_code = "".join(code_parts)
+    queue_dump(translate_request, translated_code)
+    return TranslateResponse(
+        translated_code=translated_code, reasoning="".join(reasoning_parts), warnings=warnings, errors=errors
+    )
+
+
+async def perform_translation_batch(translate_requests: list[TranslateRequest]) -> list[TranslateResponse]:
+    """
+    Translates independent requests concurrently, the number of LLM calls in flight stays bounded by
+    LLM_MAX_CONCURRENCY. A failed translation is reported in the errors of its response, the others still complete.
+    """
+    results = await asyncio.gather(
+        *(_collect_translation(translate_request) for translate_request in translate_requests), return_exceptions=True
+    )
+    responses = []
+    for result in results:
+        if isinstance(result, Exception):
+            result = TranslateResponse(translated_code="", reasoning="", errors=[str(result)])
+        elif isinstance(result, BaseException):
+            # Cancellation is not a failed translation, it ends the whole batch
+            raise result
+        responses.append(result)
+    return responses